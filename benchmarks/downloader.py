@@ -0,0 +1,259 @@
+"""
+Offline benchmarks for the Downloader cog's formatting, listing and scrubbing paths.
+
+Everything runs against fake repos and cogs, so no git, pip or Discord
+connection is needed, only the cog's own dependencies (Red & TagScriptEngine).
+
+Usage (from the repository root)::
+
+    python benchmarks/downloader.py --repos 50 --cogs 40 --log-mb 8
+    python benchmarks/downloader.py --output before.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import statistics
+import datetime
+import functools
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import TagScriptEngine as tse  # noqa: E402
+
+from downloader.core import Downloader  # noqa: E402
+from downloader.common.menus import Entry, LazyPageSource  # noqa: E402
+from downloader.common.utils import ReplaceVars, ReplaceVarsStream  # noqa: E402
+from downloader.common._tagscript import (  # noqa: E402
+    ATTRIBUTE_CACHE,
+    CogAdapter,
+    RepoAdapter,
+)
+
+
+ENVIRONMENT: Dict[str, str] = {
+    "USERPROFILE": "C:\\Users\\bench",
+    "HOME": "/home/bench",
+    "USERNAME": "bench",
+    "COMPUTERNAME": "BENCH-PC",
+}
+
+REPO_TEMPLATES: Dict[str, str] = {
+    "default": "{repo(url)}",
+    "cogs": "{repo(cogs)}",
+    "mixed": "{repo(name)} by {repo(author)} - {repo(short)} ({repo(branch)})",
+}
+
+COG_TEMPLATES: Dict[str, str] = {
+    "default": "{cog(short)}",
+    "requirements": "{cog(requirements)} | {cog(tags)}",
+    "mixed": "{cog(name)}: {cog(description)} [{cog(min_bot)}-{cog(max_bot)}]",
+}
+
+WORDS: Tuple[str, ...] = (
+    "role", "music", "moderation", "economy", "fun", "utility", "logging",
+    "ticket", "welcome", "levels", "games", "starboard", "reminder", "audio",
+)  # fmt: skip
+
+
+class FakeCog:
+    def __init__(self, repo: "FakeRepo", index: int, rng: random.Random) -> None:
+        words: List[str] = rng.sample(WORDS, 4)
+        self.name: str = "{}{}".format(words[0], index)
+        self.repo: FakeRepo = repo
+        self.repo_name: str = repo.name
+        self.commit: str = repo.commit
+        self.short: str = "A {} and {} cog.".format(words[1], words[2])
+        self.description: str = " ".join(rng.choice(WORDS) for _ in range(40))
+        self.author: Tuple[str, ...] = ("author{}".format(index % 7), "helper")
+        self.end_user_data_statement: str = "This cog does not store data."
+        self.min_bot_version: str = "3.5.0"
+        self.max_bot_version: str = "0.0.0"
+        self.min_python_version: Tuple[int, int, int] = (3, 8, 1)
+        self.hidden: bool = False
+        self.required_cogs: Dict[str, str] = {
+            words[3]: "https://github.com/example/{}".format(words[3])
+        }
+        self.requirements: Tuple[str, ...] = tuple(
+            "{}>={}.0".format(word, rng.randint(1, 9)) for word in words[:3]
+        )
+        self.tags: Tuple[str, ...] = tuple(words)
+        self.install_msg: str = "Thanks for installing {}!".format(self.name)
+
+
+class FakeRepo:
+    def __init__(self, index: int, cogs: int, rng: random.Random) -> None:
+        self.name: str = "Repo-{}".format(index)
+        self.url: str = "https://github.com/example/repo-{}".format(index)
+        self.clean_url: str = self.url
+        self.branch: str = "main"
+        self.commit: str = "{:040x}".format(rng.getrandbits(160))
+        self.author: Tuple[str, ...] = ("maintainer{}".format(index),)
+        self.short: str = "Cogs number {}.".format(index)
+        self.description: str = "A repository with {} cogs.".format(cogs)
+        self.install_msg: str = "Thanks for adding repo {}!".format(index)
+        self.available_cogs: Tuple[FakeCog, ...] = tuple(
+            FakeCog(self, number, rng) for number in range(cogs)
+        )
+
+
+def pip_log(size: int, rng: random.Random) -> str:
+    lines: List[str] = []
+    total: int = 0
+    while total < size:
+        package: str = rng.choice(WORDS)
+        line: str = rng.choice(
+            (
+                "Collecting {0}>=1.0\n  Downloading {0}-1.2.3-py3-none-any.whl (120 kB)",
+                "Requirement already satisfied: {0} in /home/bench/.local/lib/python3.11",
+                "  Saved C:\\Users\\bench\\AppData\\Local\\pip\\cache\\{0}.whl",
+                "  Stored in directory: c:/users/bench/appdata/local/pip/cache/{0}",
+                "Installing collected packages: {0} (by BENCH-PC\\bench)",
+            )
+        ).format(package)
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines)
+
+
+def measure(function: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    timings: List[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {
+        "runs": repeat,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "max": max(timings),
+    }
+
+
+def cold(function: Callable[[], Any]) -> Callable[[], Any]:
+    def wrapper() -> Any:
+        ATTRIBUTE_CACHE.clear()
+        return function()
+
+    return wrapper
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    os.environ.update(ENVIRONMENT)
+    rng: random.Random = random.Random(args.seed)
+    repos: List[FakeRepo] = [FakeRepo(i, args.cogs, rng) for i in range(args.repos)]
+    cogs: List[FakeCog] = [cog for repo in repos for cog in repo.available_cogs]
+    log: str = pip_log(int(args.log_mb * 1024 * 1024), rng)
+    # only the interpreter is needed by the formatting methods
+    cog: Any = SimpleNamespace(
+        interpreter=tse.Interpreter([tse.LooseVariableGetterBlock()])
+    )
+    format_repo: Callable[..., str] = functools.partial(Downloader._format_repo, cog)
+    format_cog: Callable[..., str] = functools.partial(Downloader._format_cog, cog)
+
+    results: Dict[str, Dict[str, float]] = {}
+    results["adapter.repo.construct"] = measure(
+        cold(lambda: [RepoAdapter(repo) for repo in repos]), args.repeat
+    )
+    results["adapter.cog.construct"] = measure(
+        cold(lambda: [CogAdapter(cog) for cog in cogs]), args.repeat
+    )
+    for name, template in REPO_TEMPLATES.items():
+        listing: Callable[[], Any] = lambda t=template: [  # noqa: E731
+            format_repo(repo, t) for repo in repos
+        ]
+        results["repo_list.{}.cold".format(name)] = measure(cold(listing), args.repeat)
+        results["repo_list.{}.warm".format(name)] = measure(listing, args.repeat)
+    for name, template in COG_TEMPLATES.items():
+        listing: Callable[[], Any] = lambda t=template: [  # noqa: E731
+            format_cog(cog, t) for cog in cogs
+        ]
+        results["cog_list.{}.cold".format(name)] = measure(cold(listing), args.repeat)
+        results["cog_list.{}.warm".format(name)] = measure(listing, args.repeat)
+
+        async def first_page(t: str = template) -> str:
+            source: LazyPageSource = LazyPageSource(
+                [Entry("> Available Cogs", "+", cog.name, cog) for cog in cogs],
+                functools.partial(format_cog, formatting=t),
+            )
+            page: Any = await source.get_page(0)
+            return await source.format_page(SimpleNamespace(current_page=0), page)
+
+        loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        try:
+            results["cog_list.{}.first_page".format(name)] = measure(
+                cold(lambda t=template: loop.run_until_complete(first_page(t))),
+                args.repeat,
+            )
+        finally:
+            loop.close()
+    results["replace_vars.full"] = measure(
+        lambda: ReplaceVars(log).replace(), args.repeat
+    )
+
+    def stream() -> str:
+        scrubber: ReplaceVarsStream = ReplaceVarsStream()
+        chunks: List[str] = [
+            scrubber.feed(log[i : i + args.chunk])
+            for i in range(0, len(log), args.chunk)
+        ]
+        chunks.append(scrubber.flush())
+        return "".join(chunks)
+
+    results["replace_vars.stream"] = measure(stream, args.repeat)
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repos": args.repos,
+            "cogs_per_repo": args.cogs,
+            "log_bytes": len(log),
+            "chunk": args.chunk,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repos", type=int, default=25, help="number of fake repos")
+    parser.add_argument("--cogs", type=int, default=30, help="cogs per fake repo")
+    parser.add_argument(
+        "--log-mb", type=float, default=4.0, help="size of the synthetic pip log"
+    )
+    parser.add_argument(
+        "--chunk", type=int, default=64 * 1024, help="chunk size for streaming"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="seed for fake data")
+    parser.add_argument(
+        "--output", type=Path, default=None, help="write JSON results to this file"
+    )
+    args: argparse.Namespace = parser.parse_args(argv)
+    report: Dict[str, Any] = run(args)
+    width: int = max(len(name) for name in report["results"])
+    for name, timing in report["results"].items():
+        print(
+            "{:<{}}  median {:>10.3f}ms  min {:>10.3f}ms".format(
+                name, width, timing["median"] * 1000, timing["min"] * 1000
+            )
+        )
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=4), encoding="utf-8")
+        print("Results written to {}".format(args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Per-module import time of the cogs in this repository.
+
+Every cog is imported in a fresh interpreter with ``-X importtime``, so the numbers
+include everything a cold ``load``/``reload`` pays for, the best of ``--repeat``
+runs is kept for every module.
+
+Usage (from the repository root)::
+
+    python benchmarks/imports.py
+    python benchmarks/imports.py timetracker --top 15 --output imports.json
+"""
+
+import re
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Pattern
+
+ROOT: Path = Path(__file__).resolve().parent.parent
+
+LINE: Pattern[str] = re.compile(
+    r"^import time:\s+(?P<self>\d+)\s+\|\s+(?P<cumulative>\d+)\s+\|(?P<name>\s*\S+)$"
+)
+
+
+class Timing(NamedTuple):
+    name: str
+    depth: int
+    own: int
+    cumulative: int
+
+
+def cogs() -> List[str]:
+    return sorted(
+        path.name
+        for path in ROOT.iterdir()
+        if (path / "__init__.py").is_file() and (path / "info.json").is_file()
+    )
+
+
+def measure(package: str) -> List[Timing]:
+    process: subprocess.CompletedProcess[str] = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import {}".format(package)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    timings: List[Timing] = []
+    errors: List[str] = []
+    for line in process.stderr.splitlines():
+        match: Optional[re.Match[str]] = LINE.match(line)
+        if match is None:
+            if not line.startswith("import time:"):
+                errors.append(line)
+            continue
+        name: str = match.group("name")
+        timings.append(
+            Timing(
+                name.strip(),
+                (len(name) - len(name.lstrip()) - 1) // 2,
+                int(match.group("self")),
+                int(match.group("cumulative")),
+            )
+        )
+    if process.returncode != 0:
+        raise RuntimeError(
+            "importing {} failed:\n{}".format(package, "\n".join(errors[-10:]))
+        )
+    # the output is in post-order, the package's own imports are everything
+    # between it and the previous top level import (i.e. interpreter startup)
+    end: int = next(
+        index
+        for index, timing in enumerate(timings)
+        if timing.depth == 0 and timing.name == package
+    )
+    start: int = end
+    while start > 0 and timings[start - 1].depth > 0:
+        start -= 1
+    return timings[start : end + 1]
+
+
+def best(package: str, repeat: int) -> Dict[str, Timing]:
+    results: Dict[str, Timing] = {}
+    for _ in range(repeat):
+        for timing in measure(package):
+            current: Optional[Timing] = results.get(timing.name)
+            if current is None or timing.cumulative < current.cumulative:
+                results[timing.name] = timing
+    return results
+
+
+def report(package: str, timings: Dict[str, Timing], top: int) -> Dict[str, Any]:
+    own: List[Timing] = sorted(
+        (
+            timing
+            for name, timing in timings.items()
+            if name == package or name.startswith(package + ".")
+        ),
+        key=lambda timing: timing.name,
+    )
+    dependencies: List[Timing] = sorted(
+        (
+            timing
+            for name, timing in timings.items()
+            if name != package and not name.startswith(package + ".")
+        ),
+        key=lambda timing: timing.cumulative,
+        reverse=True,
+    )
+    # only count packages imported on their own, not their submodules again
+    roots: List[Timing] = [
+        timing for timing in dependencies if "." not in timing.name
+    ][:top]
+    total: int = timings[package].cumulative if package in timings else 0
+    return {
+        "total": total,
+        "modules": {timing.name: timing._asdict() for timing in own},
+        "dependencies": {timing.name: timing._asdict() for timing in roots},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "packages", nargs="*", help="cogs to measure, defaults to every cog"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="runs per cog")
+    parser.add_argument(
+        "--top", type=int, default=10, help="slowest dependencies to show"
+    )
+    parser.add_argument(
+        "--output", type=Path, default=None, help="write JSON results to this file"
+    )
+    args: argparse.Namespace = parser.parse_args(argv)
+    results: Dict[str, Any] = {}
+    for package in args.packages or cogs():
+        try:
+            results[package] = report(package, best(package, args.repeat), args.top)
+        except RuntimeError as error:
+            print(error, file=sys.stderr)
+            continue
+        print("{}: {:.1f}ms".format(package, results[package]["total"] / 1000))
+        for section in ("modules", "dependencies"):
+            print("  {}:".format(section))
+            for name, timing in results[package][section].items():
+                print(
+                    "    {:<40} self {:>9.1f}ms  cumulative {:>9.1f}ms".format(
+                        name, timing["own"] / 1000, timing["cumulative"] / 1000
+                    )
+                )
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=4), encoding="utf-8")
+        print("Results written to {}".format(args.output))
+
+
+if __name__ == "__main__":
+    main()
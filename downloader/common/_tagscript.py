@@ -1,4 +1,17 @@
-from typing import Dict, Final, Union
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Final,
+    FrozenSet,
+    Hashable,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from redbot.cogs.downloader.repo_manager import Repo
 from redbot.cogs.downloader.installable import Installable, InstalledModule
@@ -15,80 +28,73 @@ MISSING: Final[Dict[str, str]] = {
 }
 
 
-class RepoAdapter(Adapter):
-    def __init__(self, base: Repo) -> None:
-        self.object: Repo = base
-        self._attributes: Dict[str, str] = {
-            "name": self.object.name,
-            "url": self.object.clean_url,
-            "author": humanize_list(list(getattr(self.object, "author", ())))
-            or MISSING["info"],
-            "cogs": humanize_list([cog.name for cog in self.object.available_cogs]),
-            "branch": getattr(self.object, "branch", "default"),
-            "description": getattr(self.object, "description", MISSING["info"]),
-            "short": getattr(self.object, "short", MISSING["info"]),
-            "install_msg": getattr(self.object, "install_msg", MISSING["info"]),
-        }
+class AttributeCache:
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize: int = maxsize
+        self._data: "OrderedDict[Hashable, Dict[str, str]]" = OrderedDict()
 
     def __repr__(self) -> str:
-        return "<{} object={}>".format(type(self).__qualname__, self.object)
+        return "<{} size={} maxsize={}>".format(
+            type(self).__qualname__, len(self._data), self.maxsize
+        )
 
-    def get_value(self, ctx: Verb) -> str:  # type: ignore
-        should_escape = False
-        if ctx.parameter is None:
-            return_value = self.object.name
-        else:
-            try:
-                value = self._attributes[ctx.parameter]
-            except KeyError:
-                return  # type: ignore
-            if isinstance(value, tuple):
-                value, should_escape = value
-            return_value = str(value) if value is not None else None
-        return escape_content(return_value) if should_escape else return_value  # type: ignore
+    def __len__(self) -> int:
+        return len(self._data)
 
+    def get(self, key: Hashable) -> Dict[str, str]:
+        try:
+            self._data.move_to_end(key)
+            return self._data[key]
+        except KeyError:
+            value: Dict[str, str] = {}
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return value
 
-class CogAdapter(Adapter):
-    def __init__(self, base: Union[Installable, InstalledModule]) -> None:
-        self.object: Union[Installable, InstalledModule] = base
-        self._attributes: Dict[str, str] = {
-            "name": self.object.name,
-            "description": getattr(self.object, "description", MISSING["info"]),
-            "short": getattr(self.object, "short", MISSING["info"]),
-            "repo_name": getattr(self.object, "repo_name", MISSING["cog"]),
-            "commit": getattr(self.object, "commit", MISSING["cog"]),
-            "author": humanize_list(list(getattr(self.object, "author", ())))
-            or MISSING["info"],
-            "data_statement": getattr(
-                self.object, "end_user_data_statement", MISSING["info"]
-            ),
-            "min_bot": getattr(self.object, "min_bot_version", "None").__str__(),
-            "max_bot": getattr(self.object, "max_bot_version", "None").__str__(),
-            "min_python": getattr(self.object, "min_python_version", "None").__str__(),
-            "hidden": getattr(self.object, "hidden", False).__str__(),
-            "required_cogs": humanize_list(
-                humanize_required_cogs(getattr(self.object, "required_cogs", {}))
-            )
-            or MISSING["info"],
-            "requirements": humanize_list(
-                list(getattr(self.object, "requirements", ()))
-            )
-            or MISSING["info"],
-            "tags": humanize_list(list(getattr(self.object, "tags", ())))
-            or MISSING["info"],
-            "install_msg": getattr(self.object, "install_msg", MISSING["info"]),
-        }
+    def clear(self) -> None:
+        self._data.clear()
+
+
+ATTRIBUTE_CACHE: Final[AttributeCache] = AttributeCache()
+
+
+class _LazyAdapter(Adapter, ABC):
+    RESOLVERS: ClassVar[Dict[str, Callable[[Any], Optional[str]]]] = {}
+    # attributes which depend on the object itself rather than the repo's commit
+    UNSHARED: ClassVar[FrozenSet[str]] = frozenset()
+
+    def __init__(self, base: Any) -> None:
+        self.object: Any = base
+        self._attributes: Dict[str, Optional[str]] = {}
+        key: Optional[Tuple[str, ...]] = self._cache_key()
+        self._shared: Dict[str, str] = ATTRIBUTE_CACHE.get(key) if key else {}
 
     def __repr__(self) -> str:
         return "<{} object={}>".format(type(self).__qualname__, self.object)
 
+    @abstractmethod
+    def _cache_key(self) -> Optional[Tuple[str, ...]]:
+        raise NotImplementedError
+
+    def _resolve(self, name: str) -> Optional[str]:
+        try:
+            return self._attributes[name]
+        except KeyError:
+            pass
+        shared: bool = name not in self.UNSHARED
+        if shared and name in self._shared:
+            value: Optional[str] = self._shared[name]
+        else:
+            value: Optional[str] = self.RESOLVERS[name](self.object)
+            if shared and value is not None:
+                self._shared[name] = value
+        self._attributes[name] = value
+        return value
+
     def update_attributes(self) -> None:
-        additional: Dict[str, str] = {}
-        if self.object.repo:
-            additional["repo"] = getattr(self.object.repo, "clean_url", MISSING["cog"])
-        if isinstance(self.object, InstalledModule):
-            additional["pinned"] = self.object.pinned.__str__()
-        self._attributes.update(additional)
+        for name in self.RESOLVERS:
+            self._resolve(name)
 
     def get_value(self, ctx: Verb) -> str:  # type: ignore
         should_escape = False
@@ -96,10 +102,79 @@ class CogAdapter(Adapter):
             return_value = self.object.name
         else:
             try:
-                value = self._attributes[ctx.parameter]
+                value = self._resolve(ctx.parameter)
             except KeyError:
                 return  # type: ignore
             if isinstance(value, tuple):
                 value, should_escape = value
             return_value = str(value) if value is not None else None
-        return escape_content(return_value) if should_escape else return_value  # type: ignore
+        return (
+            escape_content(return_value) if should_escape else return_value  # type: ignore
+        )
+
+
+class RepoAdapter(_LazyAdapter):
+    RESOLVERS: ClassVar[Dict[str, Callable[[Repo], Optional[str]]]] = {
+        "name": lambda o: o.name,
+        "url": lambda o: o.clean_url,
+        "author": lambda o: humanize_list(list(getattr(o, "author", ())))
+        or MISSING["info"],
+        "cogs": lambda o: humanize_list([cog.name for cog in o.available_cogs]),
+        "branch": lambda o: getattr(o, "branch", "default"),
+        "description": lambda o: getattr(o, "description", MISSING["info"]),
+        "short": lambda o: getattr(o, "short", MISSING["info"]),
+        "install_msg": lambda o: getattr(o, "install_msg", MISSING["info"]),
+    }
+
+    def __init__(self, base: Repo) -> None:
+        super().__init__(base)
+        self.object: Repo
+
+    def _cache_key(self) -> Optional[Tuple[str, ...]]:
+        return ("repo", self.object.name, self.object.commit)
+
+
+class CogAdapter(_LazyAdapter):
+    RESOLVERS: ClassVar[
+        Dict[str, Callable[[Union[Installable, InstalledModule]], Optional[str]]]
+    ] = {
+        "name": lambda o: o.name,
+        "description": lambda o: getattr(o, "description", MISSING["info"]),
+        "short": lambda o: getattr(o, "short", MISSING["info"]),
+        "repo_name": lambda o: getattr(o, "repo_name", MISSING["cog"]),
+        "commit": lambda o: getattr(o, "commit", MISSING["cog"]),
+        "author": lambda o: humanize_list(list(getattr(o, "author", ())))
+        or MISSING["info"],
+        "data_statement": lambda o: getattr(
+            o, "end_user_data_statement", MISSING["info"]
+        ),
+        "min_bot": lambda o: getattr(o, "min_bot_version", "None").__str__(),
+        "max_bot": lambda o: getattr(o, "max_bot_version", "None").__str__(),
+        "min_python": lambda o: getattr(o, "min_python_version", "None").__str__(),
+        "hidden": lambda o: getattr(o, "hidden", False).__str__(),
+        "required_cogs": lambda o: humanize_list(
+            humanize_required_cogs(getattr(o, "required_cogs", {}))
+        )
+        or MISSING["info"],
+        "requirements": lambda o: humanize_list(list(getattr(o, "requirements", ())))
+        or MISSING["info"],
+        "tags": lambda o: humanize_list(list(getattr(o, "tags", ())))
+        or MISSING["info"],
+        "install_msg": lambda o: getattr(o, "install_msg", MISSING["info"]),
+        "repo": lambda o: getattr(o.repo, "clean_url", MISSING["cog"])
+        if o.repo
+        else None,
+        "pinned": lambda o: o.pinned.__str__()
+        if isinstance(o, InstalledModule)
+        else None,
+    }
+    UNSHARED: ClassVar[FrozenSet[str]] = frozenset({"commit", "pinned"})
+
+    def __init__(self, base: Union[Installable, InstalledModule]) -> None:
+        super().__init__(base)
+        self.object: Union[Installable, InstalledModule]
+
+    def _cache_key(self) -> Optional[Tuple[str, ...]]:
+        if (repo := self.object.repo) is None:
+            return None
+        return ("cog", repo.name, repo.commit, self.object.name)
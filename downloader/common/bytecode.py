@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import functools
+import compileall
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Final, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+
+IGNORED: Final[FrozenSet[str]] = frozenset({"__pycache__"})
+# below this many files starting the worker processes costs more than it saves
+POOL_THRESHOLD: Final[int] = 32
+CHUNK_SIZE: Final[int] = 16
+
+
+class CompileResult(NamedTuple):
+    compiled: int = 0
+    failed: Tuple[str, ...] = ()
+    elapsed: float = 0.0
+
+    def __str__(self) -> str:
+        return "{} compiled, {} failed".format(self.compiled, len(self.failed))
+
+
+# identifies a file's content without reading it, replaced files get a new inode
+Stamp = Tuple[int, int, int]
+
+
+def snapshot(root: Path) -> Dict[str, Stamp]:
+    """
+    The sources under ``root`` as they are now, to find what a later pip run
+    added or changed with :func:`changed_sources`.
+    """
+    stamps: Dict[str, Stamp] = {}
+    for path, directories, filenames in os.walk(root):
+        directories[:] = [name for name in directories if name not in IGNORED]
+        for filename in filenames:
+            if not filename.endswith(".py"):
+                continue
+            source: str = os.path.join(path, filename)
+            try:
+                stat: os.stat_result = os.stat(source)
+            except OSError:
+                continue
+            stamps[source] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    return stamps
+
+
+def changed_sources(root: Path, before: Dict[str, Stamp]) -> List[Path]:
+    return [
+        Path(source)
+        for source, stamp in snapshot(root).items()
+        if before.get(source) != stamp
+    ]
+
+
+def compile_sources(
+    sources: Sequence[Path], workers: Optional[int] = None
+) -> CompileResult:
+    """
+    Write the bytecode cache of ``sources`` so the next import doesn't have to,
+    spreading the work over a process pool when there are enough files.
+    """
+    if sys.dont_write_bytecode or not sources:
+        return CompileResult()
+    start: float = time.perf_counter()
+    paths: List[str] = [str(source) for source in sources]
+    compile_file = functools.partial(compileall.compile_file, quiet=2, force=True)
+    if len(paths) < POOL_THRESHOLD or workers == 1:
+        outcomes: List[bool] = [bool(compile_file(path)) for path in paths]
+    else:
+        # forking a threaded bot can deadlock the children, start them clean
+        method: str = (
+            "forkserver"
+            if "forkserver" in multiprocessing.get_all_start_methods()
+            else "spawn"
+        )
+        with ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context(method)
+        ) as executor:
+            outcomes: List[bool] = [
+                bool(outcome)
+                for outcome in executor.map(compile_file, paths, chunksize=CHUNK_SIZE)
+            ]
+    return CompileResult(
+        sum(outcomes),
+        tuple(path for path, outcome in zip(paths, outcomes) if not outcome),
+        time.perf_counter() - start,
+    )
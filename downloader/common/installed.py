@@ -0,0 +1,105 @@
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from redbot.cogs.downloader.repo_manager import RepoManager
+from redbot.cogs.downloader.installable import InstallableType, InstalledModule
+
+
+ModuleJSON = Dict[str, Union[str, bool]]
+
+
+class InstalledIndex:
+    def __init__(self, repo_manager: RepoManager) -> None:
+        self._repo_manager: RepoManager = repo_manager
+        self._json: Dict[str, Dict[str, ModuleJSON]] = {}
+        self._names: Dict[str, str] = {}
+        self._modules: Dict[str, Dict[str, InstalledModule]] = {}
+        self._stamps: Dict[str, Tuple[Optional[int], str]] = {}
+        self.loaded: bool = False
+
+    def __repr__(self) -> str:
+        return "<{} repos={} cogs={}>".format(
+            type(self).__qualname__, len(self._json), len(self._names)
+        )
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        repo_name, cog_name = key
+        return cog_name in self._json.get(repo_name, {})
+
+    def load(self, data: Dict[str, Dict[str, ModuleJSON]]) -> None:
+        self._json = {repo: dict(cogs) for repo, cogs in data.items()}
+        self._names = {
+            cog: repo for repo, cogs in self._json.items() for cog in cogs.keys()
+        }
+        self._modules.clear()
+        self._stamps.clear()
+        self.loaded = True
+
+    def invalidate(self, repo_name: Optional[str] = None) -> None:
+        if repo_name is None:
+            self._modules.clear()
+            self._stamps.clear()
+        else:
+            self._modules.pop(repo_name, None)
+            self._stamps.pop(repo_name, None)
+
+    def _stamp(self, repo_name: str) -> Tuple[Optional[int], str]:
+        # modules read their info.json from the repo folder, so a repo being
+        # updated, removed or re-added means its modules have to be rebuilt
+        repo = self._repo_manager.get_repo(repo_name)
+        return (None, "") if repo is None else (id(repo), repo.commit)
+
+    def repo(self, repo_name: str) -> Dict[str, InstalledModule]:
+        stamp: Tuple[Optional[int], str] = self._stamp(repo_name)
+        if self._stamps.get(repo_name) != stamp or repo_name not in self._modules:
+            self._modules[repo_name] = {
+                name: InstalledModule.from_json(data, self._repo_manager)
+                for name, data in self._json.get(repo_name, {}).items()
+            }
+            self._stamps[repo_name] = stamp
+        return self._modules[repo_name]
+
+    def get(self, repo_name: str, cog_name: str) -> Optional[InstalledModule]:
+        if (repo_name, cog_name) not in self:
+            return None
+        return self.repo(repo_name).get(cog_name)
+
+    def find(self, cog_name: str) -> Optional[InstalledModule]:
+        try:
+            repo_name: str = self._names[cog_name]
+        except KeyError:
+            return None
+        return self.get(repo_name, cog_name)
+
+    def all(self) -> Tuple[InstalledModule, ...]:
+        modules: List[InstalledModule] = []
+        for repo_name in list(self._json.keys()):
+            modules.extend(self.repo(repo_name).values())
+        return tuple(modules)
+
+    def add(self, modules: Iterable[InstalledModule]) -> None:
+        for module in modules:
+            if module.type != InstallableType.COG:
+                continue
+            data: ModuleJSON = module.to_json()
+            self._json.setdefault(module.repo_name, {})[module.name] = data
+            self._names[module.name] = module.repo_name
+            if module.repo_name in self._modules:
+                self._modules[module.repo_name][module.name] = (
+                    InstalledModule.from_json(data, self._repo_manager)
+                )
+
+    def remove(self, modules: Iterable[InstalledModule]) -> None:
+        for module in modules:
+            if module.type != InstallableType.COG:
+                continue
+            repo_name: str = module._json_repo_name
+            self._json.get(repo_name, {}).pop(module.name, None)
+            self._modules.get(repo_name, {}).pop(module.name, None)
+            if self._names.get(module.name) == repo_name:
+                del self._names[module.name]
+            if repo_name in self._json and not self._json[repo_name]:
+                del self._json[repo_name]
+                self.invalidate(repo_name)
@@ -0,0 +1,179 @@
+import collections
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Final,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import discord
+from redbot.core.utils.views import SimpleMenu
+from redbot.core.utils.chat_formatting import box, pagify
+from redbot.vendored.discord.ext import menus
+
+
+# what's left of a message once the code block and the page number are added
+PAGE_LIMIT: Final[int] = 1900
+
+
+class Entry(NamedTuple):
+    section: str
+    prefix: str
+    name: str
+    item: Any
+
+
+class LazyPageSource(menus.PageSource):
+    """
+    Pages of at most ``per_page`` entries, each holding only as many as fit in
+    a single message. Entries are formatted once the page they land on is
+    built, so the page count is only known after the last one is.
+    """
+
+    def __init__(
+        self,
+        entries: Sequence[Entry],
+        formatter: Callable[[Any], str],
+        *,
+        per_page: int = 10,
+        limit: int = PAGE_LIMIT,
+    ) -> None:
+        self.entries: Sequence[Entry] = entries
+        self.formatter: Callable[[Any], str] = formatter
+        self.per_page: int = per_page
+        self.limit: int = limit
+        self._pages: List[str] = []
+        self._position: int = 0
+        # (section, text) of formatted entries, or of the parts of one
+        # too long for a page of its own, not placed on a page yet
+        self._queue: Deque[Tuple[str, str]] = collections.deque()
+
+    def __repr__(self) -> str:
+        return "<{} entries={} pages={}{}>".format(
+            type(self).__qualname__,
+            len(self.entries),
+            len(self._pages),
+            "" if self.complete else "+",
+        )
+
+    @property
+    def complete(self) -> bool:
+        return self._position >= len(self.entries) and not self._queue
+
+    def _render(self, entry: Entry) -> None:
+        text: str = "{} {}: {}".format(
+            entry.prefix, entry.name, self.formatter(entry.item)
+        )
+        # leaves room for the section heading above it
+        room: int = self.limit - len(entry.section) - 1
+        if len(text) <= room:
+            self._queue.append((entry.section, text))
+            return
+        self._queue.extend(
+            (entry.section, part) for part in pagify(text, page_length=room)
+        )
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        if not self._queue and self._position < len(self.entries):
+            self._render(self.entries[self._position])
+            self._position += 1
+        return self._queue[0] if self._queue else None
+
+    def _build(self) -> None:
+        lines: List[str] = []
+        section: Optional[str] = None
+        count: int = 0
+        length: int = 0
+        while count < self.per_page and (item := self._peek()) is not None:
+            added: List[str] = [item[1]]
+            if item[0] != section:
+                added = ([""] if lines else []) + [item[0]] + added
+            size: int = sum(len(line) + 1 for line in added)
+            if lines and length + size > self.limit:
+                break
+            self._queue.popleft()
+            lines.extend(added)
+            section = item[0]
+            length += size
+            count += 1
+        self._pages.append(box("\n".join(lines), lang="markdown"))
+
+    def _build_until(self, page_number: int) -> None:
+        # negative numbers count from the end, which needs every page
+        while (
+            page_number < 0 or len(self._pages) <= page_number
+        ) and not self.complete:
+            self._build()
+        if not self._pages:
+            self._build()
+
+    def wrap(self, page_number: int) -> int:
+        """Build up to ``page_number``, wrapping around past either end."""
+        self._build_until(page_number)
+        if 0 <= page_number < len(self._pages):
+            return page_number
+        return page_number % len(self._pages)
+
+    def is_paginating(self) -> bool:
+        return len(self._pages) > 1 or not self.complete
+
+    def get_max_pages(self) -> int:
+        return len(self._pages) + (not self.complete)
+
+    async def get_page(self, page_number: int) -> str:
+        self._build_until(page_number)
+        return self._pages[page_number]
+
+    async def format_page(self, view: discord.ui.View, page: str) -> str:
+        if not self.is_paginating():
+            return page
+        number: int = getattr(view, "current_page", 0)
+        if self.complete:
+            return page + "Page {}/{}".format(number + 1, len(self._pages))
+        return page + "Page {}".format(number + 1)
+
+
+class _LastPageButton(discord.ui.Button):
+    async def callback(self, interaction: discord.Interaction) -> None:
+        view: "LazyMenu" = self.view  # type: ignore
+        kwargs: Dict[str, Any] = await view.get_page(-1)
+        await interaction.response.edit_message(**kwargs)
+
+
+class LazyMenu(SimpleMenu):
+    def __init__(self, source: LazyPageSource, **kwargs: Any) -> None:
+        # two pages so SimpleMenu adds the navigation, ``start`` drops it again
+        # if the first page turns out to hold everything
+        super().__init__(["", ""], **kwargs)
+        self._source: LazyPageSource = source
+        # SimpleMenu's last button needs the page count up front
+        if self.last_button in self.children:
+            self.remove_item(self.last_button)
+            self.last_button = _LastPageButton(
+                style=self.last_button.style, emoji=self.last_button.emoji
+            )
+            self.add_item(self.last_button)
+
+    async def start(self, ctx: Any, **kwargs: Any) -> None:
+        self._source.wrap(self.current_page)
+        if not self._source.is_paginating():
+            for button in (
+                self.first_button,
+                self.backward_button,
+                self.forward_button,
+                self.last_button,
+            ):
+                self.remove_item(button)
+        await super().start(ctx, **kwargs)
+
+    async def get_page(self, page_num: int) -> Dict[str, Optional[Any]]:
+        # pages past the end only exist once they are built, so going past
+        # either end is resolved by the source rather than by an IndexError
+        self.current_page = self._source.wrap(page_num)
+        return await super().get_page(self.current_page)
@@ -0,0 +1,122 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import SpecifierSet
+from packaging.utils import canonicalize_name
+from packaging.version import InvalidVersion, Version
+
+# a bound is the version and whether it is itself allowed
+Bound = Tuple[Version, bool]
+
+
+class RequirementConflict(NamedTuple):
+    name: str
+    specs: Tuple[str, ...]
+
+
+def _is_empty_range(specifier: SpecifierSet) -> bool:
+    # only ordered bounds are compared, ``!=`` and wildcards never
+    # make a range provably empty on their own
+    lower: Optional[Bound] = None
+    upper: Optional[Bound] = None
+    for s in specifier:
+        try:
+            version: Version = Version(s.version)
+        except InvalidVersion:
+            continue
+        bounds: List[Tuple[str, Bound]] = []
+        if s.operator in (">", ">="):
+            bounds.append((">", (version, s.operator == ">=")))
+        elif s.operator in ("<", "<="):
+            bounds.append(("<", (version, s.operator == "<=")))
+        elif s.operator == "~=":
+            prefix: List[int] = list(version.release[:-1])
+            prefix[-1] += 1
+            bounds.append((">", (version, True)))
+            bounds.append(("<", (Version(".".join(map(str, prefix))), False)))
+        for side, bound in bounds:
+            if side == ">" and (
+                lower is None
+                or bound[0] > lower[0]
+                or (bound[0] == lower[0] and not bound[1])
+            ):
+                lower = bound
+            elif side == "<" and (
+                upper is None
+                or bound[0] < upper[0]
+                or (bound[0] == upper[0] and not bound[1])
+            ):
+                upper = bound
+    if lower is None or upper is None:
+        return False
+    return lower[0] > upper[0] or (
+        lower[0] == upper[0] and not (lower[1] and upper[1])
+    )
+
+
+def _merge_group(
+    group: List[Tuple[str, Requirement]]
+) -> Tuple[Optional[str], Optional[RequirementConflict]]:
+    first: Requirement = group[0][1]
+    specs: Tuple[str, ...] = tuple(dict.fromkeys(spec for spec, _ in group))
+    urls: Set[str] = {req.url for _, req in group if req.url}
+    if len(urls) > 1:
+        return None, RequirementConflict(first.name, specs)
+    extras: Set[str] = set()
+    specifier: SpecifierSet = SpecifierSet()
+    for _, req in group:
+        extras |= req.extras
+        specifier &= req.specifier
+    pins: Set[str] = {
+        s.version
+        for s in specifier
+        if s.operator in ("==", "===") and not s.version.endswith("*")
+    }
+    if (
+        len(pins) > 1
+        or any(not specifier.contains(pin, prereleases=True) for pin in pins)
+        or _is_empty_range(specifier)
+    ):
+        return None, RequirementConflict(first.name, specs)
+    merged: str = first.name
+    if extras:
+        merged += "[{}]".format(",".join(sorted(extras)))
+    if urls:
+        merged += " @ {}".format(next(iter(urls)))
+        if first.marker:
+            merged += " "
+    else:
+        merged += str(specifier)
+    if first.marker:
+        merged += "; {}".format(first.marker)
+    return merged, None
+
+
+def merge_requirements(
+    requirements: Iterable[str],
+) -> Tuple[List[str], List[RequirementConflict]]:
+    groups: Dict[Tuple[str, str], List[Tuple[str, Requirement]]] = {}
+    # anything pip understands but packaging doesn't (e.g. bare VCS urls)
+    # is passed through untouched, only removing exact duplicates
+    verbatim: Dict[str, None] = {}
+    for spec in requirements:
+        spec = spec.strip()
+        if not spec:
+            continue
+        try:
+            req: Requirement = Requirement(spec)
+        except InvalidRequirement:
+            verbatim[spec] = None
+            continue
+        key: Tuple[str, str] = (canonicalize_name(req.name), str(req.marker or ""))
+        groups.setdefault(key, []).append((spec, req))
+    merged: List[str] = []
+    conflicts: List[RequirementConflict] = []
+    for group in groups.values():
+        requirement, conflict = _merge_group(group)
+        if conflict is not None:
+            conflicts.append(conflict)
+        elif requirement is not None:
+            merged.append(requirement)
+    merged.extend(verbatim.keys())
+    return merged, conflicts
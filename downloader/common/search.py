@@ -0,0 +1,151 @@
+import re
+import bisect
+import collections
+from typing import (
+    DefaultDict,
+    Dict,
+    Final,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+)
+
+from redbot.cogs.downloader.repo_manager import Repo
+from redbot.cogs.downloader.installable import Installable
+
+
+TOKEN: Final[Pattern[str]] = re.compile(r"[a-z0-9]+")
+
+WEIGHTS: Final[Dict[str, float]] = {
+    "name": 4.0,
+    "tags": 3.0,
+    "short": 2.0,
+    "description": 1.0,
+}
+
+# a query token which is only a prefix of an indexed token counts for less
+PREFIX_PENALTY: Final[float] = 0.5
+
+
+Key = Tuple[str, str]
+
+
+class SearchResult(NamedTuple):
+    cog: Installable
+    matched: int
+    score: float
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN.findall(text.lower()) if text else []
+
+
+class SearchIndex:
+    def __init__(self) -> None:
+        self._postings: DefaultDict[str, Dict[Key, float]] = collections.defaultdict(
+            dict
+        )
+        self._documents: Dict[Key, Installable] = {}
+        self._tokens: Dict[Key, Set[str]] = {}
+        self._repos: Dict[str, Tuple[str, Set[str]]] = {}
+        self._vocabulary: List[str] = []
+        self._dirty: bool = False
+
+    def __repr__(self) -> str:
+        return "<{} repos={} cogs={} tokens={}>".format(
+            type(self).__qualname__,
+            len(self._repos),
+            len(self._documents),
+            len(self._postings),
+        )
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def sync(self, repos: Iterable[Repo]) -> None:
+        current: Dict[str, Repo] = {repo.name: repo for repo in repos}
+        for name in self._repos.keys() - current.keys():
+            self.remove_repo(name)
+        for name, repo in current.items():
+            indexed: Optional[Tuple[str, Set[str]]] = self._repos.get(name)
+            if indexed is None or indexed[0] != repo.commit:
+                self.add_repo(repo)
+
+    def add_repo(self, repo: Repo) -> None:
+        self.remove_repo(repo.name)
+        names: Set[str] = set()
+        for cog in repo.available_cogs:
+            if cog.hidden:
+                continue
+            self._add(cog)
+            names.add(cog.name)
+        self._repos[repo.name] = (repo.commit, names)
+
+    def remove_repo(self, name: str) -> None:
+        try:
+            __, names = self._repos.pop(name)
+        except KeyError:
+            return
+        for cog_name in names:
+            self._remove((name, cog_name))
+
+    def _add(self, cog: Installable) -> None:
+        key: Key = (cog.repo_name, cog.name)
+        weights: Dict[str, float] = {}
+        fields: Dict[str, Iterable[str]] = {
+            "name": tokenize(cog.name),
+            "tags": [token for tag in cog.tags for token in tokenize(tag)],
+            "short": tokenize(getattr(cog, "short", None)),
+            "description": tokenize(getattr(cog, "description", None)),
+        }
+        for field, tokens in fields.items():
+            for token in tokens:
+                weights[token] = max(weights.get(token, 0.0), WEIGHTS[field])
+        for token, weight in weights.items():
+            if token not in self._postings:
+                self._dirty = True
+            self._postings[token][key] = weight
+        self._documents[key] = cog
+        self._tokens[key] = set(weights.keys())
+
+    def _remove(self, key: Key) -> None:
+        self._documents.pop(key, None)
+        for token in self._tokens.pop(key, ()):
+            postings: Dict[Key, float] = self._postings.get(token, {})
+            postings.pop(key, None)
+            if not postings:
+                self._postings.pop(token, None)
+                self._dirty = True
+
+    def _expand(self, token: str) -> List[str]:
+        if self._dirty:
+            self._vocabulary = sorted(self._postings.keys())
+            self._dirty = False
+        start: int = bisect.bisect_left(self._vocabulary, token)
+        end: int = bisect.bisect_left(self._vocabulary, token + "\uffff")
+        return self._vocabulary[start:end]
+
+    def search(self, query: str, limit: int = 50) -> List[SearchResult]:
+        matched: DefaultDict[Key, int] = collections.defaultdict(int)
+        scores: DefaultDict[Key, float] = collections.defaultdict(float)
+        for token in dict.fromkeys(tokenize(query)):
+            best: Dict[Key, float] = {}
+            for candidate in self._expand(token):
+                factor: float = 1.0 if candidate == token else PREFIX_PENALTY
+                for key, weight in self._postings[candidate].items():
+                    best[key] = max(best.get(key, 0.0), weight * factor)
+            for key, weight in best.items():
+                matched[key] += 1
+                scores[key] += weight
+        ranked: List[Key] = sorted(
+            scores.keys(),
+            key=lambda key: (-matched[key], -scores[key], key[1].lower(), key[0]),
+        )
+        return [
+            SearchResult(self._documents[key], matched[key], scores[key])
+            for key in ranked[:limit]
+        ]
@@ -0,0 +1,107 @@
+import os
+import shutil
+import hashlib
+from pathlib import Path
+from concurrent.futures import Executor
+from typing import Dict, Final, FrozenSet, List, NamedTuple, Tuple
+
+
+IGNORED: Final[FrozenSet[str]] = frozenset({"__pycache__"})
+BLOCK_SIZE: Final[int] = 1 << 16
+
+
+class SyncResult(NamedTuple):
+    changed: Tuple[str, ...] = ()
+    skipped: Tuple[str, ...] = ()
+    removed: Tuple[str, ...] = ()
+    elapsed: float = 0.0
+
+    def __str__(self) -> str:
+        return "{} changed, {} unchanged, {} removed".format(
+            len(self.changed), len(self.skipped), len(self.removed)
+        )
+
+    def __add__(self, other: "SyncResult") -> "SyncResult":  # type: ignore
+        return SyncResult(
+            self.changed + other.changed,
+            self.skipped + other.skipped,
+            self.removed + other.removed,
+            self.elapsed + other.elapsed,
+        )
+
+
+def digest(path: Path) -> bytes:
+    hasher = hashlib.blake2b()
+    with path.open("rb") as file:
+        for block in iter(lambda: file.read(BLOCK_SIZE), b""):
+            hasher.update(block)
+    return hasher.digest()
+
+
+def walk(root: Path) -> Dict[str, Path]:
+    files: Dict[str, Path] = {}
+    for path, directories, filenames in os.walk(root):
+        directories[:] = [name for name in directories if name not in IGNORED]
+        for filename in filenames:
+            full: Path = Path(path) / filename
+            files[full.relative_to(root).as_posix()] = full
+    return files
+
+
+def _sync_file(source: Path, target: Path) -> bool:
+    if target.is_file():
+        # sizes are free to compare and catch most edits without reading anything
+        if source.stat().st_size == target.stat().st_size and digest(
+            source
+        ) == digest(target):
+            return False
+    elif target.is_dir():
+        shutil.rmtree(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(source, target)
+    return True
+
+
+def sync_tree(source: Path, target: Path, executor: Executor) -> SyncResult:
+    """
+    Make ``target`` mirror ``source``, only touching the files which differ.
+
+    Files are compared by size and content hash on the given executor,
+    files missing from ``source`` are removed from ``target``.
+    ``__pycache__`` directories are left alone on both sides.
+    """
+    if source.is_file():
+        if target.is_dir():
+            shutil.rmtree(target)
+        changed: bool = _sync_file(source, target)
+        return SyncResult(
+            changed=(source.name,) if changed else (),
+            skipped=() if changed else (source.name,),
+        )
+    if target.is_file():
+        target.unlink()
+    sources: Dict[str, Path] = walk(source)
+    targets: Dict[str, Path] = walk(target) if target.is_dir() else {}
+    names: List[str] = list(sources.keys())
+    outcomes: List[bool] = list(
+        executor.map(
+            lambda name: _sync_file(sources[name], target / name),
+            names,
+        )
+    )
+    removed: List[str] = []
+    for name in sorted(targets.keys() - sources.keys()):
+        targets[name].unlink()
+        removed.append(name)
+    # drop directories which no longer hold anything but bytecode
+    for path, directories, filenames in os.walk(target, topdown=False):
+        relative: Path = Path(path).relative_to(target)
+        if not relative.parts or any(part in IGNORED for part in relative.parts):
+            continue
+        if not (source / relative).is_dir():
+            shutil.rmtree(target / relative, ignore_errors=True)
+    return SyncResult(
+        changed=tuple(name for name, done in zip(names, outcomes) if done),
+        skipped=tuple(name for name, done in zip(names, outcomes) if not done),
+        removed=tuple(removed),
+    )
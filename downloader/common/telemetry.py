@@ -0,0 +1,103 @@
+import os
+import json
+import math
+import time
+import collections
+from pathlib import Path
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
+
+
+class Record(NamedTuple):
+    kind: str
+    target: str
+    start: float
+    duration: float
+    exit_code: Optional[int] = None
+    output: int = 0
+
+
+class Summary(NamedTuple):
+    count: int
+    p50: float
+    p95: float
+    failures: int
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    # nearest-rank, expects ``values`` to be sorted
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+class Telemetry:
+    def __init__(self, path: Path, maxlen: int = 1000) -> None:
+        self.path: Path = path
+        self.records: Deque[Record] = collections.deque(maxlen=maxlen)
+        # records only keep ``perf_counter`` values, this turns them into wall time
+        self._offset: float = time.time() - time.perf_counter()
+        self._dirty: bool = False
+
+    def __repr__(self) -> str:
+        return "<{} records={} path={}>".format(
+            type(self).__qualname__, len(self.records), self.path
+        )
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def record(
+        self,
+        kind: str,
+        target: str,
+        start: float,
+        end: float,
+        exit_code: Optional[int] = None,
+        output: int = 0,
+    ) -> None:
+        self.records.append(
+            Record(kind, target, start + self._offset, end - start, exit_code, output)
+        )
+        self._dirty = True
+
+    def load(self) -> None:
+        try:
+            with self.path.open("r", encoding="utf-8") as file:
+                lines: List[str] = file.readlines()
+        except FileNotFoundError:
+            return
+        for line in lines[-(self.records.maxlen or len(lines)) :]:
+            try:
+                self.records.append(Record(*json.loads(line)))
+            except (ValueError, TypeError):
+                continue
+
+    def flush(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        temporary: Path = self.path.with_suffix(".tmp")
+        with temporary.open("w", encoding="utf-8") as file:
+            for record in tuple(self.records):
+                file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        os.replace(temporary, self.path)
+
+    def recent(self, count: int = 10) -> List[Record]:
+        return list(self.records)[-count:][::-1]
+
+    def summary(self) -> Dict[str, Summary]:
+        grouped: Dict[str, Tuple[List[float], List[bool]]] = {}
+        for record in self.records:
+            durations, failures = grouped.setdefault(record.kind, ([], []))
+            durations.append(record.duration)
+            failures.append(record.exit_code not in (None, 0))
+        summary: Dict[str, Summary] = {}
+        for kind, (durations, failures) in sorted(grouped.items()):
+            durations.sort()
+            summary[kind] = Summary(
+                len(durations),
+                percentile(durations, 0.50),
+                percentile(durations, 0.95),
+                sum(failures),
+            )
+        return summary
@@ -1,7 +1,22 @@
 import os
 import re
+import datetime
 from abc import ABC, abstractmethod
-from typing import Any, ClassVar, Dict, List, Tuple
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    List,
+    Match,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Tuple,
+)
+
+from redbot.cogs.downloader.repo_manager import Repo
+from redbot.cogs.downloader.installable import Installable
 
 
 def humanize_required_cogs(data: Dict[str, str]) -> List[str]:
@@ -13,6 +28,40 @@ def humanize_required_cogs(data: Dict[str, str]) -> List[str]:
     return response
 
 
+class RepoUpdateResult(NamedTuple):
+    repo: Repo
+    old: str
+    new: str
+    elapsed: float
+    error: Optional[Exception] = None
+
+    @property
+    def updated(self) -> bool:
+        return self.error is None and self.old != self.new
+
+
+class UpdateCheck(NamedTuple):
+    checked_at: datetime.datetime
+    cogs: Tuple[Installable, ...]
+    libraries: Tuple[Installable, ...]
+    failed: Tuple[str, ...]
+
+
+Snapshot = Tuple[Optional[str], ...]
+Compiled = Tuple[Optional[Pattern[str]], Dict[str, str], int]
+
+
+class _FakeDict(Dict[str, str]):
+    def __init__(self, *args: Any, env_vars: Tuple[str, ...], **kwargs: Any) -> None:
+        self.env_vars: Tuple[str, ...] = env_vars
+        super().__init__(*args, **kwargs)
+
+    def __missing__(self, key: str) -> str:
+        if key.upper() in self.env_vars and key.upper() in os.environ:
+            return os.environ[key.upper()]
+        return f"{{{key}}}"
+
+
 class _ReplaceVars(ABC):
 
     ENV_VARS: ClassVar[Tuple[str, ...]] = (
@@ -22,6 +71,8 @@ class _ReplaceVars(ABC):
         "COMPUTERNAME",
     )
 
+    _compiled: ClassVar[Optional[Tuple[Snapshot, Compiled]]] = None
+
     def __init__(
         self, content: str, reverse: bool = False, replacement: bool = True
     ) -> None:
@@ -38,10 +89,51 @@ class _ReplaceVars(ABC):
 
     def __str__(self) -> str:
         return self.content.strip()
-    
+
     def replace(self) -> str:
         return self.content.strip()
 
+    @classmethod
+    def _pattern(cls) -> Compiled:
+        snapshot: Snapshot = tuple(os.environ.get(var) for var in cls.ENV_VARS)
+        if cls._compiled is None or cls._compiled[0] != snapshot:
+            cls._compiled = (snapshot, cls._compile(snapshot))
+        return cls._compiled[1]
+
+    @classmethod
+    def _compile(cls, snapshot: Snapshot) -> Compiled:
+        seen: Dict[str, str] = {}
+        for var, value in zip(cls.ENV_VARS, snapshot):
+            if not value:
+                continue
+            for variant in (
+                value,
+                value.replace("\\", "\\\\"),
+                value.replace("\\", "/"),
+            ):
+                seen.setdefault(variant.lower(), var)
+        if not seen:
+            return None, {}, 0
+        # longest first so that a value is never shadowed by one of its prefixes,
+        # the sort is stable so ties keep the ``ENV_VARS`` priority
+        ordered: List[Tuple[str, str]] = sorted(
+            seen.items(), key=lambda item: len(item[0]), reverse=True
+        )
+        groups: Dict[str, str] = {}
+        alternatives: List[str] = []
+        for index, (variant, var) in enumerate(ordered):
+            groups["_{}".format(index)] = var
+            alternatives.append("(?P<_{}>{})".format(index, re.escape(variant)))
+        return (
+            re.compile("|".join(alternatives), re.I),
+            groups,
+            len(ordered[0][0]),
+        )
+
+    @staticmethod
+    def _substitute(groups: Dict[str, str]) -> Callable[[Match[str]], str]:
+        return lambda match: "{{{}}}".format(groups[match.lastgroup])
+
     @abstractmethod
     def _replace(self) -> str:
         raise NotImplementedError
@@ -54,31 +146,55 @@ class ReplaceVars(_ReplaceVars):
         if not self.reverse:
             if not self.replacement:
                 return self.content
-            for env_var in self.ENV_VARS:
-                if env_var in os.environ:
-                    regex = re.compile(re.escape(os.environ[env_var]), re.I)
-                    self.content = regex.sub(f"{{{env_var}}}", self.content)
-                    regex = re.compile(
-                        re.escape(os.environ[env_var].replace("\\", "\\\\")), re.I
-                    )
-                    self.content = regex.sub(f"{{{env_var}}}", self.content)
-                    regex = re.compile(
-                        re.escape(os.environ[env_var].replace("\\", "/")), re.I
-                    )
-                    self.content = regex.sub(f"{{{env_var}}}", self.content)
+            pattern, groups, _ = self._pattern()
+            if pattern is not None:
+                self.content = pattern.sub(self._substitute(groups), self.content)
         else:
+            self.content = self.content.format_map(_FakeDict(env_vars=self.ENV_VARS))
+        return self.content
 
-            class FakeDict(Dict):
-                def __init__(
-                    self, *args: Any, env_vars: Tuple[str, ...], **kwargs: Any
-                ) -> None:
-                    self.env_vars: Tuple[str, ...] = env_vars
-                    super().__init__(*args, **kwargs)
 
-                def __missing__(self, key: str) -> str:
-                    if key.upper() in self.env_vars and key.upper() in os.environ:
-                        return os.environ[key.upper()]
-                    return f"{{{key}}}"
+class ReplaceVarsStream:
+    def __init__(self, replacement: bool = True) -> None:
+        self.replacement: bool = replacement
+        self._pending: str = ""
 
-            self.content = self.content.format_map(FakeDict(env_vars=self.ENV_VARS))
-        return self.content
+    def __repr__(self) -> str:
+        return "<{} replacement={} pending={}>".format(
+            type(self).__qualname__, self.replacement, len(self._pending)
+        )
+
+    def feed(self, chunk: str) -> str:
+        if not self.replacement:
+            return chunk
+        pattern, groups, longest = ReplaceVars._pattern()
+        if pattern is None:
+            buffer, self._pending = self._pending + chunk, ""
+            return buffer
+        buffer: str = self._pending + chunk
+        # a match starting before ``cut`` can be fully decided with what we have,
+        # anything after it might still grow once the next chunk arrives
+        cut: int = len(buffer) - longest + 1
+        substitute: Callable[[Match[str]], str] = ReplaceVars._substitute(groups)
+        parts: List[str] = []
+        position: int = 0
+        for match in pattern.finditer(buffer):
+            if match.start() >= cut:
+                break
+            parts.append(buffer[position : match.start()])
+            parts.append(substitute(match))
+            position = match.end()
+        if cut > position:
+            parts.append(buffer[position:cut])
+            position = cut
+        self._pending = buffer[position:]
+        return "".join(parts)
+
+    def flush(self) -> str:
+        buffer, self._pending = self._pending, ""
+        if not self.replacement or not buffer:
+            return buffer
+        pattern, groups, _ = ReplaceVars._pattern()
+        if pattern is None:
+            return buffer
+        return pattern.sub(ReplaceVars._substitute(groups), buffer)
@@ -1,26 +1,65 @@
+import time
+import random
 import asyncio
+import datetime
+import contextlib
 import functools
 import subprocess
 from pathlib import Path
+from collections import defaultdict
 from sys import executable
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any, ClassVar, Iterable, List, Optional, Set, Union, cast
-
-import TagScriptEngine as tse
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    ClassVar,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
 import discord
 from redbot.core import commands
 from redbot.core.bot import Red
+from redbot.core.data_manager import cog_data_path
 from redbot.cogs.downloader.repo_manager import Repo
 from redbot.core.utils.views import ConfirmView
 from redbot.core.utils.menus import close_menu, menu, DEFAULT_CONTROLS
-from redbot.core.utils.chat_formatting import pagify, box
+from redbot.core.utils.chat_formatting import (
+    box,
+    humanize_list,
+    humanize_number,
+    inline,
+    pagify,
+)
+from redbot.cogs.downloader.log import log
 from redbot.cogs.downloader.downloader import Downloader as _Downloader
 from redbot.cogs.downloader.installable import Installable, InstalledModule
 from redbot.cogs.downloader.repo_manager import ProcessFormatter
 
-from .common.utils import ReplaceVars
-from .common._tagscript import RepoAdapter, CogAdapter
+from .common.utils import ReplaceVars, RepoUpdateResult, UpdateCheck
+from .common.installed import InstalledIndex
+from .common.sync import SyncResult, sync_tree
+from .common.bytecode import (
+    CompileResult,
+    Stamp,
+    changed_sources,
+    compile_sources,
+    snapshot,
+)
+from .common.search import SearchIndex, SearchResult, tokenize
+from .common.menus import Entry, LazyMenu, LazyPageSource
+from .common.telemetry import Record, Summary, Telemetry
+
+if TYPE_CHECKING:
+    import TagScriptEngine as tse
 
 
 class Downloader(_Downloader):
@@ -28,7 +67,12 @@ class Downloader(_Downloader):
 
     __version__: ClassVar[str] = "1.0.0"
 
-    PIP_INSTALL: ClassVar[str] = "{python} -m pip install -U -t {target} {requirements}"
+    # bytecode is compiled by ``_precompile`` afterwards, in parallel and in place
+    PIP_INSTALL: ClassVar[str] = (
+        "{python} -m pip install -U --no-compile -t {target} {requirements}"
+    )
+    PREFETCH_JITTER: ClassVar[float] = 0.1
+    TELEMETRY_FLUSH_INTERVAL: ClassVar[float] = 60.0
 
     repo: commands.Group = cast(commands.Group, _Downloader.repo.copy())
     cog: commands.Group = cast(commands.Group, _Downloader.cog.copy())
@@ -36,19 +80,133 @@ class Downloader(_Downloader):
     def __init__(self, bot: Red) -> None:
         super().__init__(bot)
         self.bot: Red = bot
-        self.interpreter: tse.Interpreter = tse.Interpreter(
-            [tse.LooseVariableGetterBlock()]
-        )
         self.__executor: ThreadPoolExecutor = ThreadPoolExecutor(1)
         self.__lock: asyncio.Lock = asyncio.Lock()
+        self._installed_index: InstalledIndex = InstalledIndex(self._repo_manager)
+        self.config.register_global(update_concurrency=4, prefetch_interval=0)
+        self._prefetch_task: Optional[asyncio.Task[None]] = None
+        self._prefetch_interval: int = 0
+        # held from one checkout of a repo until it's back on its own commit
+        self._checkout_lock: asyncio.Lock = asyncio.Lock()
+        self._checkout_owner: Optional[asyncio.Task[Any]] = None
+        self._update_check: Optional[UpdateCheck] = None
+        self._copy_executor: ThreadPoolExecutor = ThreadPoolExecutor(4)
+        self._sync_results: Dict[str, SyncResult] = {}
+        self._compile_queue: List[Path] = []
+        self._compile_result: Optional[CompileResult] = None
+        self._search_index: SearchIndex = SearchIndex()
+        self._telemetry: Telemetry = Telemetry(cog_data_path(self) / "telemetry.jsonl")
+        self._telemetry_task: Optional[asyncio.Task[None]] = None
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
         pre_processed = super().format_help_for_context(ctx)
         n = "\n" if "\n\n" not in pre_processed else ""
         return f"{pre_processed}{n}\n" f"Version: {self.__version__}\n"
 
+    async def initialize(self) -> None:
+        await asyncio.to_thread(self._telemetry.load)
+        await super().initialize()
+        self._start_prefetch(await self.config.prefetch_interval())
+        self._telemetry_task = asyncio.create_task(self._telemetry_loop())
+
+    def cog_unload(self) -> None:
+        super().cog_unload()
+        if self._prefetch_task is not None:
+            self._prefetch_task.cancel()
+        if self._telemetry_task is not None:
+            self._telemetry_task.cancel()
+        self._copy_executor.shutdown(wait=False)
+        try:
+            self._telemetry.flush()
+        except OSError:
+            log.exception("Failed to save Downloader telemetry.")
+
+    async def _telemetry_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.TELEMETRY_FLUSH_INTERVAL)
+            try:
+                await asyncio.to_thread(self._telemetry.flush)
+            except OSError:
+                log.exception("Failed to save Downloader telemetry.")
+
+    def _start_prefetch(self, interval: int) -> None:
+        if self._prefetch_task is not None:
+            self._prefetch_task.cancel()
+            self._prefetch_task = None
+        self._prefetch_interval = interval
+        if interval > 0:
+            self._prefetch_task = asyncio.create_task(self._prefetch_loop(interval))
+
+    async def _prefetch_loop(self, interval: int) -> None:
+        await self._ready.wait()
+        if self._ready_raised:
+            return
+        # spread the first run out too, so that restarts don't all fetch at once
+        delay: float = random.uniform(0, interval * self.PREFETCH_JITTER)
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._check_for_updates()
+            except Exception as error:
+                log.exception("Failed to prefetch repo updates.", exc_info=error)
+            delay = interval + random.uniform(0, interval * self.PREFETCH_JITTER)
+
+    @contextlib.asynccontextmanager
+    async def _checkouts(self) -> AsyncIterator[None]:
+        # re-entrant for the task holding it, updates install through it
+        task: Optional[asyncio.Task[Any]] = asyncio.current_task()
+        if task is not None and self._checkout_owner is task:
+            yield
+            return
+        async with self._checkout_lock:
+            self._checkout_owner = task
+            try:
+                yield
+            finally:
+                self._checkout_owner = None
+
+    async def _check_for_updates(self) -> UpdateCheck:
+        failed: Tuple[str, ...] = tuple(
+            result.repo.name
+            for result in await self._update_repos()
+            if result.error is not None
+        )
+        cogs_to_check: Set[InstalledModule] = {
+            cog
+            for cog in await self.installed_cogs()
+            if cog.repo is not None and cog.repo.name not in failed
+        }
+        # only this checks out other revisions, the fetches above don't need it
+        async with self._checkouts():
+            cogs, libraries = await self._available_updates(cogs_to_check)
+        self._update_check = UpdateCheck(
+            datetime.datetime.now(datetime.timezone.utc), cogs, libraries, failed
+        )
+        return self._update_check
+
+    def _cached_update_check(self) -> Optional[UpdateCheck]:
+        # only trusted while prefetching keeps it at most about one interval old
+        check: Optional[UpdateCheck] = self._update_check
+        if check is None or self._prefetch_task is None or self._prefetch_task.done():
+            return None
+        age: datetime.timedelta = datetime.datetime.now(datetime.timezone.utc) - (
+            check.checked_at
+        )
+        if age.total_seconds() > self._prefetch_interval * (1 + self.PREFETCH_JITTER):
+            return None
+        return check
+
+    @functools.cached_property
+    def interpreter(self) -> "tse.Interpreter":
+        # TagScriptEngine is only imported once something actually gets formatted
+        import TagScriptEngine as tse
+
+        return tse.Interpreter([tse.LooseVariableGetterBlock()])
+
     def _format_repo(self, repo: Repo, formatting: str) -> str:
-        output: tse.Response = self.interpreter.process(
+        from .common._tagscript import RepoAdapter
+
+        output: "tse.Response" = self.interpreter.process(
             formatting, {"repo": RepoAdapter(repo)}
         )
         return output.body  # type: ignore
@@ -56,15 +214,252 @@ class Downloader(_Downloader):
     def _format_cog(
         self, cog: Union[Installable, InstalledModule], formatting: str
     ) -> str:
-        output: tse.Response = self.interpreter.process(
+        from .common._tagscript import CogAdapter
+
+        output: "tse.Response" = self.interpreter.process(
             formatting, {"cog": CogAdapter(cog)}
         )
         return output.body  # type: ignore
 
+    async def _get_installed_index(self) -> InstalledIndex:
+        if not self._installed_index.loaded:
+            self._installed_index.load(await self.config.installed_cogs())
+        return self._installed_index
+
+    async def installed_cogs(self) -> Tuple[InstalledModule, ...]:
+        return (await self._get_installed_index()).all()
+
+    async def is_installed(
+        self, cog_name: str
+    ) -> Union[Tuple[bool, InstalledModule], Tuple[bool, None]]:
+        cog: Optional[InstalledModule] = (await self._get_installed_index()).find(
+            cog_name
+        )
+        return (True, cog) if cog is not None else (False, None)
+
+    async def _save_to_installed(self, modules: Iterable[InstalledModule]) -> None:
+        modules = tuple(modules)
+        await super()._save_to_installed(modules)
+        (await self._get_installed_index()).add(modules)
+        self._update_check = None
+
+    async def _remove_from_installed(
+        self, modules: Iterable[InstalledModule]
+    ) -> None:
+        modules = tuple(modules)
+        await super()._remove_from_installed(modules)
+        (await self._get_installed_index()).remove(modules)
+        self._update_check = None
+
+    async def _update_repos(
+        self, repos: Optional[Iterable[Repo]] = None
+    ) -> List[RepoUpdateResult]:
+        targets: Tuple[Repo, ...] = (
+            tuple(dict.fromkeys(repos)) if repos else self._repo_manager.repos
+        )
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(
+            await self.config.update_concurrency()
+        )
+
+        async def _update(repo: Repo) -> RepoUpdateResult:
+            async with semaphore:
+                start: float = time.perf_counter()
+                try:
+                    old, new = await repo.update()
+                except Exception as error:
+                    # anything a single repo raises is reported with it, so it
+                    # can't abort the summary while the other fetches carry on
+                    end: float = time.perf_counter()
+                    self._telemetry.record("git", repo.name, start, end, 1)
+                    log.error(
+                        "Repository '%s' failed to update. URL: '%s' on branch '%s'",
+                        repo.name,
+                        repo.url,
+                        repo.branch,
+                        exc_info=error,
+                    )
+                    return RepoUpdateResult(repo, "", "", end - start, error)
+                end: float = time.perf_counter()
+                self._telemetry.record("git", repo.name, start, end, 0)
+                return RepoUpdateResult(repo, old, new, end - start)
+
+        return list(await asyncio.gather(*(_update(repo) for repo in targets)))
+
+    async def _get_cogs_to_check(
+        self,
+        *,
+        repos: Optional[Iterable[Repo]] = None,
+        cogs: Optional[Iterable[InstalledModule]] = None,
+        update_repos: bool = True,
+    ) -> Tuple[Set[InstalledModule], List[str]]:
+        failed: List[str] = []
+        if not (cogs or repos):
+            if update_repos:
+                failed = [
+                    result.repo.name
+                    for result in await self._update_repos()
+                    if result.error is not None
+                ]
+            cogs_to_check: Set[InstalledModule] = {
+                cog
+                for cog in await self.installed_cogs()
+                if cog.repo is not None and cog.repo.name not in failed
+            }
+        else:
+            if not repos:
+                cogs = cast(Iterable[InstalledModule], cogs)
+                repos = {cog.repo for cog in cogs if cog.repo is not None}
+            if update_repos:
+                failed = [
+                    result.repo.name
+                    for result in await self._update_repos(repos)
+                    if result.error is not None
+                ]
+            if failed:
+                repos = {repo for repo in repos if repo.name not in failed}
+            if cogs:
+                cogs_to_check: Set[InstalledModule] = {
+                    cog for cog in cogs if cog.repo is not None and cog.repo in repos
+                }
+            else:
+                cogs_to_check: Set[InstalledModule] = {
+                    cog
+                    for cog in await self.installed_cogs()
+                    if cog.repo is not None and cog.repo in repos
+                }
+        return (cogs_to_check, failed)
+
+    async def _sync_cog(self, cog: Installable, target_dir: Path) -> bool:
+        start: float = time.perf_counter()
+        try:
+            result: SyncResult = await asyncio.to_thread(
+                sync_tree,
+                cog._location,
+                target_dir / cog._location.name,
+                self._copy_executor,
+            )
+        except Exception:
+            self._telemetry.record("install", cog.name, start, time.perf_counter(), 1)
+            log.exception("Error occurred when copying path: %s", cog._location)
+            return False
+        end: float = time.perf_counter()
+        self._telemetry.record("install", cog.name, start, end, 0)
+        result = result._replace(elapsed=end - start)
+        self._sync_results[cog.name] = result
+        destination: Path = target_dir / cog._location.name
+        self._compile_queue.extend(
+            destination / name if destination.is_dir() else destination
+            for name in result.changed
+            if name.endswith(".py")
+        )
+        log.debug("Copied %s (%s) in %.3fs.", cog.name, result, result.elapsed)
+        return True
+
+    async def _install_cogs(
+        self, cogs: Iterable[Installable]
+    ) -> Tuple[Tuple[InstalledModule, ...], Tuple[Installable, ...]]:
+        async with self._checkouts():
+            return await self.__install_cogs(cogs)
+
+    async def __install_cogs(
+        self, cogs: Iterable[Installable]
+    ) -> Tuple[Tuple[InstalledModule, ...], Tuple[Installable, ...]]:
+        repos: Dict[str, Tuple[Repo, Dict[str, List[Installable]]]] = {}
+        for cog in cogs:
+            try:
+                repo_by_commit = repos[cog.repo_name]
+            except KeyError:
+                cog.repo = cast(Repo, cog.repo)
+                repo_by_commit = repos[cog.repo_name] = (cog.repo, defaultdict(list))
+            repo_by_commit[1][cog.commit].append(cog)
+        installed: List[InstalledModule] = []
+        failed: List[Installable] = []
+        target_dir: Path = await self.cog_install_path()
+        for repo, cogs_by_commit in repos.values():
+            exit_to_commit: str = repo.commit
+            for commit, cogs_to_install in cogs_by_commit.items():
+                await repo.checkout(commit)
+                for cog in cogs_to_install:
+                    if await self._sync_cog(cog, target_dir):
+                        installed.append(InstalledModule.from_installable(cog))
+                    else:
+                        failed.append(cog)
+            await repo.checkout(exit_to_commit)
+        sources: List[Path] = self._compile_queue
+        self._compile_queue = []
+        self._compile_result = await self._precompile(
+            ", ".join(module.name for module in installed), sources
+        )
+        return (tuple(installed), tuple(failed))
+
+    async def _precompile(
+        self,
+        target: str,
+        sources: Optional[List[Path]] = None,
+        *,
+        before: Optional[Dict[str, Stamp]] = None,
+    ) -> CompileResult:
+        """
+        Compile the given sources, or the ones added to or changed in
+        ``LIB_PATH`` since the ``before`` snapshot of it, so the next
+        (re)load doesn't have to.
+        """
+        if sources is not None and not sources:
+            return CompileResult()
+        start: float = time.perf_counter()
+        try:
+            if sources is None:
+                sources = await asyncio.to_thread(
+                    changed_sources, self.LIB_PATH, before or {}
+                )
+            result: CompileResult = await asyncio.to_thread(compile_sources, sources)
+        except Exception:
+            self._telemetry.record("compile", target, start, time.perf_counter(), 1)
+            log.exception("Failed to precompile %s.", target)
+            return CompileResult()
+        self._telemetry.record(
+            "compile", target, start, time.perf_counter(), int(bool(result.failed))
+        )
+        if result.failed:
+            log.debug("Could not compile: %s", ", ".join(result.failed))
+        log.debug("Precompiled %s (%s) in %.3fs.", target, result, result.elapsed)
+        return result
+
+    async def _update_cogs_and_libs(
+        self,
+        ctx: commands.Context,
+        cogs_to_update: Iterable[Installable],
+        libs_to_update: Iterable[Installable],
+        current_cog_versions: Iterable[InstalledModule],
+    ) -> Tuple[Set[str], str]:
+        self._sync_results.clear()
+        self._compile_result = None
+        start: float = time.perf_counter()
+        async with self._checkouts():
+            updated_cognames, message = await super()._update_cogs_and_libs(
+                ctx, cogs_to_update, libs_to_update, current_cog_versions
+            )
+        self._telemetry.record(
+            "update",
+            ", ".join(sorted(updated_cognames)),
+            start,
+            time.perf_counter(),
+            0 if updated_cognames or not cogs_to_update else 1,
+        )
+        if self._sync_results:
+            total: SyncResult = sum(self._sync_results.values(), SyncResult())
+            message += "\nFiles: {} in {:.2f}s.".format(total, total.elapsed)
+        if self._compile_result is not None and self._compile_result.compiled:
+            message += "\nBytecode: {} in {:.2f}s.".format(
+                self._compile_result, self._compile_result.elapsed
+            )
+        return (updated_cognames, message)
+
     async def _run(
-        self, *args: Any, **kwargs: Any
+        self, *args: Any, kind: str = "run", target: str = "", **kwargs: Any
     ) -> subprocess.CompletedProcess[bytes]:
         async with self.__lock:
+            start: float = time.perf_counter()
             process: (
                 subprocess.CompletedProcess
             ) = await asyncio.get_running_loop().run_in_executor(
@@ -77,24 +472,80 @@ class Downloader(_Downloader):
                     **kwargs,
                 ),
             )
+            self._telemetry.record(
+                kind,
+                target,
+                start,
+                time.perf_counter(),
+                process.returncode,
+                len(process.stdout or b"") + len(process.stderr or b""),
+            )
             return process
 
-    async def _pip(self, requirements: Iterable[str], target_dir: Path) -> str:
-        if not requirements:
-            raise commands.BadArgument("Requirements not found.")
-        process: subprocess.CompletedProcess[bytes] = await self._run(
+    async def _pip_process(
+        self, requirements: Iterable[str], target_dir: Path
+    ) -> subprocess.CompletedProcess[bytes]:
+        return await self._run(
             ProcessFormatter().format(
                 self.PIP_INSTALL,
                 python=executable,
                 target=target_dir,
                 requirements=requirements,
-            )
+            ),
+            kind="pip",
+            target=" ".join(requirements),
+        )
+
+    async def _pip(self, requirements: Iterable[str], target_dir: Path) -> str:
+        if not requirements:
+            raise commands.BadArgument("Requirements not found.")
+        process: subprocess.CompletedProcess[bytes] = await self._pip_process(
+            requirements, target_dir
         )
         return (
             process.stdout.decode("utf-8").strip()
             or process.stderr.decode("utf-8").strip()
         )
 
+    async def _install_requirements(
+        self, cogs: Iterable[Installable]
+    ) -> Tuple[str, ...]:
+        from .common.requirements import merge_requirements
+
+        requirements, conflicts = merge_requirements(
+            requirement for cog in cogs for requirement in cog.requirements
+        )
+        if conflicts:
+            for conflict in conflicts:
+                log.error(
+                    "Conflicting requirements for '%s': %s",
+                    conflict.name,
+                    ", ".join(conflict.specs),
+                )
+            return tuple(spec for conflict in conflicts for spec in conflict.specs)
+        if not requirements:
+            return ()
+        before: Dict[str, Stamp] = await asyncio.to_thread(snapshot, self.LIB_PATH)
+        process: subprocess.CompletedProcess[bytes] = await self._pip_process(
+            requirements, self.LIB_PATH
+        )
+        if process.returncode == 0:
+            await self._precompile("libraries", before=before)
+            return ()
+        log.error(
+            "Something went wrong when installing the following requirements: %s",
+            ", ".join(requirements),
+        )
+        # the resolver only tells us the batch failed, retry one
+        # by one so the owner knows which requirements to look at
+        failed: List[str] = []
+        for requirement in requirements:
+            process = await self._pip_process([requirement], self.LIB_PATH)
+            if process.returncode != 0:
+                failed.append(requirement)
+        await self._precompile("libraries", before=before)
+        return tuple(failed) or tuple(requirements)
+
     async def _ask_for_cog_reload(
         self, ctx: commands.Context, updated_cognames: Set[str]
     ) -> None:
@@ -129,7 +580,13 @@ class Downloader(_Downloader):
     @commands.command(require_var_positional=True, help=_Downloader.pipinstall.help)
     async def pipinstall(self, ctx: commands.Context, *deps: str) -> None:
         async with ctx.typing():
+            before: Dict[str, Stamp] = await asyncio.to_thread(snapshot, self.LIB_PATH)
             response: str = ReplaceVars(await self._pip(deps, self.LIB_PATH)).replace()
+            result: CompileResult = await self._precompile(
+                " ".join(deps), before=before
+            )
+        if result.compiled or result.failed:
+            response += "\n\nBytecode: {} in {:.2f}s.".format(result, result.elapsed)
         pages: List[str] = [p for p in pagify(response)]
         formatted: List[str] = [
             f"{box('Page {}/{}'.format(index + 1, len(pages)))}\n\n"
@@ -141,6 +598,126 @@ class Downloader(_Downloader):
         )
         await menu(ctx, formatted, controls=controls, timeout=120.0)  # type: ignore
 
+    repo.remove_command("update")
+
+    @repo.command(name="update", help=_Downloader._repo_update.help)
+    async def _repo_update(self, ctx: commands.Context, *repos: Repo) -> None:
+        async with ctx.typing():
+            start: float = time.perf_counter()
+            results: List[RepoUpdateResult] = await self._update_repos(repos)
+            total: float = time.perf_counter() - start
+        updated: List[str] = [r.repo.name for r in results if r.updated]
+        failed: List[str] = [r.repo.name for r in results if r.error is not None]
+        if updated:
+            message: str = "Repo update completed successfully.\nUpdated: {}".format(
+                humanize_list(tuple(map(inline, updated)))
+            )
+        elif not repos:
+            message: str = "All installed repos are already up to date."
+        elif len(results) > 1:
+            message: str = "These repos are already up to date."
+        else:
+            message: str = "This repo is already up to date."
+        if failed:
+            message += "\n" + self.format_failed_repos(failed)
+        width: int = max((len(r.repo.name) for r in results), default=0)
+        lines: List[str] = []
+        for result in sorted(results, key=lambda r: r.repo.name.lower()):
+            if result.error is not None:
+                prefix, status = "-", "failed"
+            elif result.updated:
+                prefix, status = "+", "{} -> {}".format(
+                    result.old[:7], result.new[:7]
+                )
+            else:
+                prefix, status = " ", "up to date"
+            lines.append(
+                "{} {:<{}}  {:>7.2f}s  {}".format(
+                    prefix, result.repo.name, width, result.elapsed, status
+                )
+            )
+        lines.append(
+            "# {} repo{} in {:.2f}s ({} at once)".format(
+                len(results),
+                "s" if len(results) != 1 else "",
+                total,
+                await self.config.update_concurrency(),
+            )
+        )
+        pages: List[str] = list(pagify("\n".join(lines), ["\n"], shorten_by=16))
+        await ctx.send("{}\n{}".format(message, box(pages[0], lang="diff")))
+        for page in pages[1:]:
+            await ctx.send(box(page, lang="diff"))
+
+    @repo.command(name="concurrency")
+    async def _repo_concurrency(
+        self, ctx: commands.Context, limit: Optional[commands.Range[int, 1, 16]] = None
+    ) -> None:
+        """
+        Set how many repos are fetched at once when updating.
+
+        Example:
+        - `[p]repo concurrency`
+        - `[p]repo concurrency 8`
+
+        **Arguments**
+
+        - `[limit]` The number of concurrent fetches, between 1 and 16.
+        """
+        if limit is None:
+            await ctx.send(
+                "Repos are currently updated **{}** at a time.".format(
+                    await self.config.update_concurrency()
+                )
+            )
+            return
+        await self.config.update_concurrency.set(limit)
+        await ctx.send("Repos will now be updated **{}** at a time.".format(limit))
+
+    @repo.command(name="prefetch")
+    async def _repo_prefetch(
+        self,
+        ctx: commands.Context,
+        minutes: Optional[commands.Range[int, 0, 1440]] = None,
+    ) -> None:
+        """
+        Periodically fetch all repos in the background.
+
+        The available updates found by each fetch are cached, so
+        `[p]cog checkforupdates` can answer without waiting on git.
+
+        Example:
+        - `[p]repo prefetch`
+        - `[p]repo prefetch 60`
+        - `[p]repo prefetch 0`
+
+        **Arguments**
+
+        - `[minutes]` How often to fetch, `0` disables background fetching.
+        """
+        if minutes is None:
+            interval: int = await self.config.prefetch_interval()
+            if interval:
+                message: str = "Repos are fetched every **{}** minutes.".format(
+                    interval // 60
+                )
+            else:
+                message: str = "Background fetching is disabled."
+            if (check := self._update_check) is not None:
+                message += "\nLast checked {}.".format(
+                    discord.utils.format_dt(check.checked_at, "R")
+                )
+            await ctx.send(message)
+            return
+        await self.config.prefetch_interval.set(minutes * 60)
+        self._start_prefetch(minutes * 60)
+        if minutes:
+            await ctx.send(
+                "Repos will now be fetched every **{}** minutes.".format(minutes)
+            )
+        else:
+            await ctx.send("Background fetching has been disabled.")
+
     repo.remove_command("list")
 
     @repo.command(name="list")
@@ -170,21 +747,120 @@ class Downloader(_Downloader):
         repos: List[Repo] = sorted(
             self._repo_manager.repos, key=lambda r: str.lower(r.name)
         )
-        installed: List[str] = []
         if len(repos) == 0:
-            head = "There are no repos installed."
-        else:
-            if len(repos) > 1:
-                head = "#Installed Repos\n"
-            else:
-                head = "# Installed Repo\n"
-            installed = [
-                "+ {}: {}".format(item.name, self._format_repo(item, formatting))
-                for item in repos
-            ]
-        joined = f"{head}\n" + "\n".join(installed)
-        for page in pagify(joined, ["\n"], shorten_by=16):
-            await ctx.send(box(page, lang="markdown"))
+            await ctx.send(box("There are no repos installed.", lang="markdown"))
+            return
+        head: str = "# Installed Repos" if len(repos) > 1 else "# Installed Repo"
+        source: LazyPageSource = LazyPageSource(
+            [Entry(head, "+", repo.name, repo) for repo in repos],
+            functools.partial(self._format_repo, formatting=formatting),
+        )
+        await LazyMenu(source, disable_after_timeout=True).start(ctx)
+
+    cog.remove_command("checkforupdates")
+
+    @cog.command(name="checkforupdates", usage="[--refresh]")
+    async def _cog_checkforupdates(
+        self, ctx: commands.Context, refresh: Optional[Literal["--refresh"]] = None
+    ) -> None:
+        """
+        Check for available cog updates (including pinned cogs).
+
+        This command doesn't update cogs, it only checks for updates.
+        Use `[p]cog update` to update cogs.
+
+        When background fetching is enabled with `[p]repo prefetch`,
+        the last cached result is shown instead of fetching again.
+
+        Example:
+        - `[p]cog checkforupdates`
+        - `[p]cog checkforupdates --refresh`
+
+        **Arguments**
+
+        - `[--refresh]` Ignore the cached result and fetch all repos now.
+        """
+        async with ctx.typing():
+            check: Optional[UpdateCheck] = self._cached_update_check()
+            if refresh or check is None:
+                check = await self._check_for_updates()
+            cogs_to_update, filter_message = self._filter_incorrect_cogs(check.cogs)
+            message: str = ""
+            if cogs_to_update:
+                cognames: List[str] = [cog.name for cog in cogs_to_update]
+                message += (
+                    "These cogs can be updated: "
+                    if len(cognames) > 1
+                    else "This cog can be updated: "
+                ) + humanize_list(tuple(map(inline, cognames)))
+            if check.libraries:
+                libnames: List[str] = [lib.name for lib in check.libraries]
+                message += (
+                    "\nThese shared libraries can be updated: "
+                    if len(libnames) > 1
+                    else "\nThis shared library can be updated: "
+                ) + humanize_list(tuple(map(inline, libnames)))
+            if not (cogs_to_update or check.libraries) and filter_message:
+                message += "No cogs can be updated."
+            message += filter_message
+            if not message:
+                message = "All installed cogs are up to date."
+            if check.failed:
+                message += "\n" + self.format_failed_repos(check.failed)
+            message += "\nLast checked {}.".format(
+                discord.utils.format_dt(check.checked_at, "R")
+            )
+        await self.send_pagified(ctx, message)
+
+    @cog.command(name="telemetry", aliases=["stats"])
+    async def _cog_telemetry(
+        self, ctx: commands.Context, count: commands.Range[int, 1, 50] = 10
+    ) -> None:
+        """
+        Show how long recent pip, git, install and update operations took.
+
+        Example:
+        - `[p]cog telemetry`
+        - `[p]cog telemetry 25`
+
+        **Arguments**
+
+        - `[count]` How many recent operations to show, defaults to 10.
+        """
+        summary: Dict[str, Summary] = self._telemetry.summary()
+        if not summary:
+            await ctx.send("No operations have been recorded yet.")
+            return
+        recent: List[Record] = self._telemetry.recent(count)
+        lines: List[str] = [
+            "{} {:<7} {:>8.2f}s {:>4} {:>9} {}".format(
+                datetime.datetime.fromtimestamp(record.start).strftime(
+                    "%d/%m %H:%M"
+                ),
+                record.kind,
+                record.duration,
+                "-" if record.exit_code is None else record.exit_code,
+                humanize_number(record.output),
+                record.target[:40],
+            )
+            for record in recent
+        ]
+        stats: List[str] = [
+            "{:<7} {:>5} {:>8.2f}s {:>8.2f}s {:>5}".format(
+                kind, item.count, item.p50, item.p95, item.failures
+            )
+            for kind, item in summary.items()
+        ]
+        await ctx.send(
+            box(
+                "{:<7} {:>5} {:>9} {:>9} {:>5}\n".format(
+                    "type", "count", "p50", "p95", "fail"
+                )
+                + "\n".join(stats)
+            )
+        )
+        for page in pagify("\n".join(lines), ["\n"], shorten_by=16):
+            await ctx.send(box(page))
 
     cog.remove_command("list")
 
@@ -214,30 +890,68 @@ class Downloader(_Downloader):
             ``min_python``, ``hidden``, ``required_cogs``, ``requirements``,
             ``tags`` & ``install_msg``.
         """
-        installed: List[InstalledModule] = [
-            cog for cog in await self.installed_cogs() if cog.repo_name == repo.name
-        ]
+        index: InstalledIndex = await self._get_installed_index()
+        installed: List[InstalledModule] = list(index.repo(repo.name).values())
         available: List[Installable] = [
-            cog for cog in repo.available_cogs if not (cog.hidden or cog in installed)
+            cog
+            for cog in repo.available_cogs
+            if not (cog.hidden or (repo.name, cog.name) in index)
         ]
-        installed_string: str = "\n".join(
-            "- {}: {}".format(cog.name, self._format_cog(cog, formatting))
+        if not (available or installed):
+            await ctx.send(box("No cogs are available.", lang="markdown"))
+            return
+        entries: List[Entry] = [
+            Entry("> Available Cogs", "+", cog.name, cog)
+            for cog in sorted(available, key=lambda x: x.name.lower())
+        ]
+        head: str = "# Installed Cogs" if len(installed) > 1 else "# Installed Cog"
+        entries.extend(
+            Entry(head, "-", cog.name, cog)
             for cog in sorted(installed, key=lambda x: x.name.lower())
         )
-        if len(installed) > 1:
-            installed_string: str = "# Installed Cogs\n{}".format(installed_string)
-        elif installed:
-            installed_string: str = "# Installed Cog\n{}".format(installed_string)
-        available_string: str = "\n".join(
-            "+ {}: {}".format(cog.name, self._format_cog(cog, formatting))
-            for cog in sorted(available, key=lambda x: x.name.lower())
+        source: LazyPageSource = LazyPageSource(
+            entries, functools.partial(self._format_cog, formatting=formatting)
         )
-        if not available_string:
-            cogs: str = "> Available Cogs\nNo cogs are available."
-        elif len(available) > 1:
-            cogs: str = "> Available Cogs\n{}".format(available_string)
-        else:
-            cogs: str = "> Available Cogs\\n{}".format(available_string)
-        cogs: str = cogs + "\n\n" + installed_string
-        for page in pagify(cogs, ["\n"], shorten_by=16):
-            await ctx.send(box(page, lang="markdown"))
+        await LazyMenu(source, disable_after_timeout=True).start(ctx)
+
+    @cog.command(name="search")
+    async def _cog_search(
+        self, ctx: commands.Context, query: str, *, formatting: str = "{cog(short)}"
+    ) -> None:
+        """Search the available cogs from every installed repo.
+
+        Cogs are matched against their name, tags, short and description,
+        with the best matches listed first. Installed cogs are marked with `-`.
+
+        Example:
+        - `[p]cog search music`
+        - `[p]cog search "role menu" {cog(repo_name)}`
+
+        **Arguments**
+
+        - `<query>` The words to search for, use quotes for more than one word.
+        - `<formatting>` Supply custom formatting for each cog.
+
+        The formatting accepts the same `{cog}` block and attributes
+        as `[p]cog list`.
+        """
+        self._search_index.sync(self._repo_manager.repos)
+        results: List[SearchResult] = self._search_index.search(query)
+        if not results:
+            await ctx.send("No cogs matched your search.")
+            return
+        index: InstalledIndex = await self._get_installed_index()
+        head: str = "# Results for {}".format(" ".join(tokenize(query)))
+        source: LazyPageSource = LazyPageSource(
+            [
+                Entry(
+                    head,
+                    "-" if (result.cog.repo_name, result.cog.name) in index else "+",
+                    "{} ({})".format(result.cog.name, result.cog.repo_name),
+                    result.cog,
+                )
+                for result in results
+            ],
+            functools.partial(self._format_cog, formatting=formatting),
+        )
+        await LazyMenu(source, disable_after_timeout=True).start(ctx)
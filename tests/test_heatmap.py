@@ -0,0 +1,28 @@
+import numpy as np
+
+from timetracker.heatmap import HOUR, Heatmap, bin_shift_list
+from timetracker.intervals import Shift
+
+
+START: float = 1_700_000_000.0
+
+
+def test_empty_guild_is_float() -> None:
+    heatmap: Heatmap = Heatmap([])
+    assert heatmap.total.dtype == np.float64
+    assert heatmap.total.shape == (7, 24)
+    assert not heatmap.total.any()
+
+
+def test_add_to_empty_guild() -> None:
+    heatmap: Heatmap = Heatmap([])
+    heatmap.add(Shift(START, START + HOUR, 1))
+    assert heatmap.total.sum() == HOUR
+    assert heatmap.get(1).sum() == HOUR
+
+
+def test_only_open_shifts() -> None:
+    heatmap: Heatmap = Heatmap([Shift(START, None, 1)])
+    matrix: np.ndarray = heatmap.get()
+    matrix += bin_shift_list([Shift(START, None, 1)], until=START + HOUR)
+    assert matrix.sum() == HOUR
@@ -0,0 +1,65 @@
+import re
+import datetime
+from typing import Final, Optional, Pattern, Tuple
+
+from redbot.core import commands
+
+from .utils import london
+
+
+TIMESTAMP: Final[Pattern[str]] = re.compile(r"<t:(-?\d+)(?::[tTdDfFR])?>|(\d{9,})")
+
+DATETIME_FORMATS: Final[Tuple[str, ...]] = (
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y %I:%M%p",
+    "%d/%m/%Y",
+)
+TIME_FORMATS: Final[Tuple[str, ...]] = ("%H:%M", "%I:%M%p")
+
+
+class LondonTimeConverter(commands.Converter[datetime.datetime]):
+    """
+    Accepts `now`, Discord timestamps, unix timestamps, `DD/MM/YYYY HH:MM`,
+    `HH:MM` (today) or how long ago something was, e.g. `2h30m`.
+    """
+
+    async def convert(
+        self, ctx: commands.Context, argument: str
+    ) -> datetime.datetime:
+        argument = argument.strip()
+        now: datetime.datetime = datetime.datetime.now(london())
+        if argument.lower() == "now":
+            return now
+        if match := TIMESTAMP.fullmatch(argument):
+            return datetime.datetime.fromtimestamp(
+                int(match.group(1) or match.group(2)), london()
+            )
+        for fmt in DATETIME_FORMATS:
+            try:
+                return london().localize(
+                    datetime.datetime.strptime(argument, fmt)
+                )
+            except ValueError:
+                continue
+        for fmt in TIME_FORMATS:
+            try:
+                parsed: datetime.time = datetime.datetime.strptime(
+                    argument, fmt
+                ).time()
+            except ValueError:
+                continue
+            return london().localize(
+                datetime.datetime.combine(now.date(), parsed)
+            )
+        delta: Optional[datetime.timedelta] = commands.parse_timedelta(
+            argument
+        )
+        if delta is not None:
+            return now - delta
+        raise commands.BadArgument(
+            (
+                "Could not understand `{}` as a time, use `DD/MM/YYYY HH:MM` "
+                "(in quotes), `HH:MM` for today, a Discord timestamp, "
+                "or how long ago it was like `2h30m`."
+            ).format(argument)
+        )
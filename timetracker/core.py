@@ -1,11 +1,14 @@
-import datetime, operator, itertools, contextlib, collections  # noqa: E401
+import time, asyncio, hashlib, datetime, operator, itertools, functools, contextlib, collections  # noqa: E401
 from typing import (
+    Any,
     DefaultDict,
     Dict,
     Final,
     List,
     Literal,
+    TYPE_CHECKING,
     Optional,
+    Set,
     cast,
 )
 
@@ -13,12 +16,28 @@ import discord
 from redbot.core.bot import Red
 from redbot.core.utils import AsyncIter
 from redbot.core import Config, commands
+from redbot.core.config import Group
 from redbot.core.utils.views import ConfirmView, SimpleMenu
 from redbot.core.utils.mod import get_audit_reason
 from redbot.core.utils.chat_formatting import box, humanize_list, pagify
 
 from .models import Clock
-from .utils import LONDON, MAXIMUM_ROLES, ClockType
+from .converters import LondonTimeConverter
+from .importer import ParsedImport, merge, parse
+from .intervals import IntervalIndex, Shift
+from .state import MemoryBackend, RedisBackend, StateBackend, log
+from .utils import (
+    CHUNK_SIZE,
+    MAXIMUM_ROLES,
+    PROGRESS_INTERVAL,
+    ClockType,
+    london,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .heatmap import Heatmap
 
 
 class TimeTracker(commands.Cog):
@@ -36,15 +55,24 @@ class TimeTracker(commands.Cog):
         self.config: Config = Config.get_conf(
             self, identifier=69_420_666, force_registration=True
         )
-        __default_guild: Dict[str, List[int]] = {
+        __default_guild: Dict[str, Any] = {
             "roles": [],
+            "importing": None,
         }
         __default_member: Dict[str, List[ClockType]] = {"clocks": []}
+        __default_global: Dict[str, Optional[str]] = {"redis_url": None}
         self.config.register_guild(**__default_guild)
         self.config.register_member(**__default_member)
+        self.config.register_global(**__default_global)
 
-        self.cache: DefaultDict[int, Dict[int, Clock]] = (
-            collections.defaultdict(dict)
+        self.state: StateBackend = MemoryBackend()
+        self.intervals: Dict[int, IntervalIndex] = {}
+        self.heatmaps: Dict[int, "Heatmap"] = {}
+        self.importing: Set[int] = set()
+        self.resets: Dict[int, "asyncio.Task[None]"] = {}
+        # held around every read-modify-write of a guild's clock history
+        self.writing: DefaultDict[int, asyncio.Lock] = (
+            collections.defaultdict(asyncio.Lock)
         )
 
     def format_help_for_context(self, ctx: commands.Context) -> str:
@@ -58,22 +86,147 @@ class TimeTracker(commands.Cog):
         return "\n".join(text)
 
     async def cog_load(self) -> None:
+        if url := await self.config.redis_url():
+            backend: Optional[StateBackend] = None
+            try:
+                # a missing ``redis`` package or a bad URL shouldn't stop
+                # the cog from loading either
+                backend = RedisBackend.from_url(url)
+                backend.listener = self.forget_history
+                await backend.start()
+            except Exception as error:
+                log.exception(
+                    "Could not connect to the shared clock backend, "
+                    "falling back to keeping clocks in memory.",
+                    exc_info=error,
+                )
+                if backend is not None:
+                    await backend.close()
+            else:
+                self.state = backend
+        await self.seed_state(self.state)
+
+    async def cog_unload(self) -> None:
+        for task in self.resets.values():
+            task.cancel()
+        await self.state.close()
+
+    def member_group(self, guild: int) -> Group:
+        # every member of the guild at once, so a whole chunk is one write
+        return self.config._get_base_group(self.config.MEMBER, str(guild))
+
+    def forget_history(self, guild: Optional[int]) -> None:
+        # another instance changed this guild's clocks, rebuilt on next use
+        if guild is None:
+            self.intervals.clear()
+            self.heatmaps.clear()
+        else:
+            self.intervals.pop(guild, None)
+            self.heatmaps.pop(guild, None)
+
+    async def seed_state(self, backend: StateBackend) -> None:
         conf: Dict[
             str, Dict[str, Dict[str, List[ClockType]]]
         ] = await self.config.all_members()
         async for guild, items in AsyncIter(conf.items()):
-            async for member, data in AsyncIter(items.items()):
-                try:
-                    entry: ClockType = data["clocks"][-1]
-                    start, end = entry["start"], entry["end"]
-                except (IndexError, KeyError):
-                    continue
-                if not end:
-                    clock: Clock = Clock(start=start, end=end)
-                    self.cache.setdefault(int(guild), {}).setdefault(
-                        int(member), clock
-                    )
-                    break
+            await backend.seed(int(guild), self.open_clocks(items))
+
+    @staticmethod
+    def open_clocks(
+        members: Dict[Any, Dict[str, List[ClockType]]]
+    ) -> Dict[int, float]:
+        clocks: Dict[int, float] = {}
+        for member, data in members.items():
+            try:
+                entry: ClockType = data["clocks"][-1]
+                start, end = entry["start"], entry["end"]
+            except (IndexError, KeyError):
+                continue
+            if not end:
+                clocks[int(member)] = start
+        return clocks
+
+    async def get_intervals(self, guild: discord.Guild) -> IntervalIndex:
+        try:
+            return self.intervals[guild.id]
+        except KeyError:
+            pass
+        members: Dict[
+            int, Dict[str, List[ClockType]]
+        ] = await self.config.all_members(guild)
+        return self.intervals.setdefault(
+            guild.id, IntervalIndex.from_config(members)
+        )
+
+    async def get_heatmap(self, guild: discord.Guild) -> "Heatmap":
+        # numpy is only imported once someone asks for a heatmap
+        from .heatmap import Heatmap
+
+        try:
+            return self.heatmaps[guild.id]
+        except KeyError:
+            pass
+        index: IntervalIndex = await self.get_intervals(guild)
+        return self.heatmaps.setdefault(guild.id, Heatmap(index.shifts()))
+
+    async def reset_members(
+        self,
+        guild: discord.Guild,
+        channel: discord.abc.Messageable,
+        reference: discord.MessageReference,
+    ) -> None:
+        """
+        Delete every member's entries in ``guild`` in chunks, keeping the
+        event loop and the config driver free for everything else meanwhile.
+        """
+        message: discord.Message = await channel.send(
+            "Clearing time-tracker entries for all the members in this server...",
+            reference=reference,
+        )
+        members: List[int] = list(await self.config.all_members(guild))
+        updated: float = time.monotonic()
+        try:
+            for offset in range(0, len(members), CHUNK_SIZE):
+                chunk: List[int] = members[offset : offset + CHUNK_SIZE]
+                async with self.writing[guild.id]:
+                    async with self.member_group(guild.id)() as data:
+                        for member in chunk:
+                            data.pop(str(member), None)
+                    # the cleared members must not look clocked in anymore
+                    await self.state.clear(guild.id, chunk)
+                self.intervals.pop(guild.id, None)
+                self.heatmaps.pop(guild.id, None)
+                await asyncio.sleep(0)
+                if time.monotonic() - updated >= PROGRESS_INTERVAL:
+                    updated = time.monotonic()
+                    with contextlib.suppress(discord.HTTPException):
+                        await message.edit(
+                            content="Cleared {}/{} members...".format(
+                                offset + len(chunk), len(members)
+                            )
+                        )
+        except Exception as error:
+            log.exception(
+                "Failed to reset the time-tracker entries of %s.",
+                guild.id,
+                exc_info=error,
+            )
+            with contextlib.suppress(discord.HTTPException):
+                await message.edit(
+                    content="Something went wrong while clearing the entries, check the logs."
+                )
+            return
+        self.intervals.pop(guild.id, None)
+        self.heatmaps.pop(guild.id, None)
+        with contextlib.suppress(discord.HTTPException):
+            await message.edit(
+                content="Successfully clered time-tracker entries for all the members in this server."
+            )
+
+    def forget_reset(self, guild: int, task: "asyncio.Task[None]") -> None:
+        # only if it's still the registered one, not a reset started since
+        if self.resets.get(guild) is task:
+            del self.resets[guild]
 
     @commands.guild_only()
     @commands.group(
@@ -102,6 +255,10 @@ class TimeTracker(commands.Cog):
         Delete Time-Tracker logs for the entire server, or selectively for a specific user.
         """
         if mode.lower() == "all":
+            if ctx.guild.id in self.resets or ctx.guild.id in self.importing:
+                raise commands.UserFeedbackCheckFailure(
+                    "An import or reset is already running in this server."
+                )
             view: ConfirmView = ConfirmView(ctx.author)
             view.message = await ctx.send(
                 "Using the **all** mode will remove entries for all the members in this server. Do you wish to continue?",
@@ -111,12 +268,25 @@ class TimeTracker(commands.Cog):
             )
             await view.wait()
             if view.result:
-                await self.config.clear_all_members(ctx.guild)
-                await ctx.send(
-                    "Successfully clered time-tracker entries for all the members in this server.",
-                    reference=view.message.to_reference(
-                        fail_if_not_exists=False
-                    ),
+                # either could have started while the prompt was open, and
+                # nothing may be awaited between this and registering the task
+                if (
+                    ctx.guild.id in self.resets
+                    or ctx.guild.id in self.importing
+                ):
+                    raise commands.UserFeedbackCheckFailure(
+                        "An import or reset is already running in this server."
+                    )
+                task: "asyncio.Task[None]" = asyncio.create_task(
+                    self.reset_members(
+                        ctx.guild,
+                        ctx.channel,
+                        view.message.to_reference(fail_if_not_exists=False),
+                    )
+                )
+                self.resets[ctx.guild.id] = task
+                task.add_done_callback(
+                    functools.partial(self.forget_reset, ctx.guild.id)
                 )
             else:
                 await ctx.send(
@@ -137,9 +307,15 @@ class TimeTracker(commands.Cog):
             )
             await view.wait()
             if view.result:
-                await self.config.member_from_ids(
-                    ctx.guild.id, member.id
-                ).clear()
+                async with self.writing[ctx.guild.id]:
+                    await self.config.member_from_ids(
+                        ctx.guild.id, member.id
+                    ).clear()
+                    await self.state.clear(ctx.guild.id, [member.id])
+                if (index := self.intervals.get(ctx.guild.id)) is not None:
+                    index.remove_member(member.id)
+                if (heatmap := self.heatmaps.get(ctx.guild.id)) is not None:
+                    heatmap.remove_member(member.id)
                 await ctx.send(
                     "Successfully clered time-tracker entries for **{0.display_name}** (`{0.id}`) in this server.".format(
                         member
@@ -312,6 +488,314 @@ class TimeTracker(commands.Cog):
                 embeds.append(embed)
         await SimpleMenu(embeds, disable_after_timeout=True).start(ctx)
 
+    @clock.command(name="onduty", aliases=["who"])
+    async def clock_onduty(
+        self,
+        ctx: commands.GuildContext,
+        when: LondonTimeConverter,
+        until: Optional[LondonTimeConverter] = None,
+    ) -> None:
+        """
+        Show who was clocked in at a given time, or at any point between two times.
+
+        Times are in London time and can be `now`, `DD/MM/YYYY HH:MM` (in quotes), `HH:MM` for today, a Discord timestamp or how long ago, e.g. `2h30m`.
+        """
+        start: datetime.datetime = cast(datetime.datetime, when)
+        end: datetime.datetime = cast(datetime.datetime, until or when)
+        if end < start:
+            raise commands.UserFeedbackCheckFailure(
+                "The end of the period has to be after its start."
+            )
+        async with ctx.typing():
+            index: IntervalIndex = await self.get_intervals(ctx.guild)
+            shifts: List[Shift] = index.overlapping(
+                start.timestamp(), end.timestamp()
+            )
+            members: int = len({shift.member for shift in shifts})
+            fmt: str = "%d/%m/%Y %I:%M%p"
+            lines: List[str] = []
+            for shift in shifts:
+                lines.append(
+                    "- <@{}> - {} to {}".format(
+                        shift.member,
+                        datetime.datetime.fromtimestamp(
+                            shift.start, london()
+                        ).strftime(fmt),
+                        datetime.datetime.fromtimestamp(
+                            shift.end, london()
+                        ).strftime(fmt)
+                        if shift.end is not None
+                        else "still clocked in",
+                    )
+                )
+            if until is None:
+                title: str = "On Duty - {}".format(start.strftime(fmt))
+                summary: str = "**{}** member{} on duty.".format(
+                    members, "" if members == 1 else "s"
+                )
+            else:
+                title: str = "On Duty - {} to {}".format(
+                    start.strftime(fmt), end.strftime(fmt)
+                )
+                peak, at = index.peak(start.timestamp(), end.timestamp())
+                summary: str = (
+                    "**{}** member{} on duty, at most **{}** at once ({})."
+                ).format(
+                    members,
+                    "" if members == 1 else "s",
+                    peak,
+                    datetime.datetime.fromtimestamp(at, london()).strftime(
+                        fmt
+                    ),
+                )
+            pages: List[str] = list(pagify("\n".join(lines))) or [
+                "Nobody was clocked in."
+            ]
+            embeds: List[discord.Embed] = []
+            async for idx, page in AsyncIter(enumerate(pages)):
+                embed: discord.Embed = discord.Embed(
+                    title=title,
+                    description="{}\n\n{}".format(summary, page),
+                    color=await ctx.embed_color(),
+                )
+                embed.set_footer(text="{}/{}".format(idx + 1, len(pages)))
+                embeds.append(embed)
+        await SimpleMenu(embeds, disable_after_timeout=True).start(ctx)
+
+    @clock.command(name="heatmap")
+    async def clock_heatmap(
+        self,
+        ctx: commands.GuildContext,
+        member: Optional[discord.Member] = None,
+        since: Optional[LondonTimeConverter] = None,
+    ) -> None:
+        """
+        Show when people are clocked in, by weekday and hour (London time).
+
+        Covers the whole server unless a member is given, and all the recorded history unless `since` is given.
+        """
+        from .heatmap import HOUR, DAYS, bin_shift_list, render
+
+        async with ctx.typing():
+            index: IntervalIndex = await self.get_intervals(ctx.guild)
+            now: float = datetime.datetime.now(london()).timestamp()
+            target: Optional[int] = member.id if member else None
+            if since is None:
+                heatmap: "Heatmap" = await self.get_heatmap(ctx.guild)
+                matrix: "np.ndarray" = heatmap.get(target)
+                # the cached totals only cover closed shifts
+                shifts: List[Shift] = [
+                    shift
+                    for shift in index.overlapping(now)
+                    if shift.end is None
+                    and (target is None or shift.member == target)
+                ]
+                if shifts:
+                    matrix += bin_shift_list(shifts, until=now)
+            else:
+                start: float = cast(datetime.datetime, since).timestamp()
+                shifts: List[Shift] = [
+                    shift
+                    for shift in index.overlapping(start, now)
+                    if target is None or shift.member == target
+                ]
+                matrix: "np.ndarray" = bin_shift_list(
+                    shifts, since=start, until=now
+                )
+            total: float = float(matrix.sum()) / HOUR
+            if total <= 0:
+                raise commands.UserFeedbackCheckFailure(
+                    "There are no clock entries for this period."
+                )
+            day, hour = divmod(int(matrix.argmax()), 24)
+            embed: discord.Embed = discord.Embed(
+                title="Time Tracker Heatmap - {}".format(
+                    member.display_name if member else ctx.guild.name
+                ),
+                description=(
+                    "Total time - {:.1f} hours\n"
+                    "Busiest hour - {} {:02d}:00 ({:.1f} hours)\n{}"
+                ).format(
+                    total,
+                    DAYS[day],
+                    hour,
+                    float(matrix[day, hour]) / HOUR,
+                    box(render(matrix)),
+                ),
+                color=await ctx.embed_color(),
+            )
+            if since is not None:
+                embed.set_footer(
+                    text="Since {}".format(
+                        cast(datetime.datetime, since).strftime(
+                            "%d/%m/%Y %I:%M%p"
+                        )
+                    )
+                )
+        await ctx.send(
+            embed=embed,
+            reference=ctx.message.to_reference(fail_if_not_exists=False),
+            allowed_mentions=discord.AllowedMentions(replied_user=False),
+        )
+
+    @clock.command(name="import")
+    async def clock_import(self, ctx: commands.GuildContext) -> None:
+        """
+        Import historical clock entries from an attached CSV or JSONL file.
+
+        Every row needs a `member` ID, a `start` and an `end`, either as unix timestamps or ISO 8601 dates (London time unless stated otherwise). The `end` may only be left empty on a member's latest entry.
+        Entries are merged into the existing history, running the same file again resumes an interrupted import.
+        """
+        if not ctx.message.attachments:
+            raise commands.UserFeedbackCheckFailure(
+                "Attach the CSV or JSONL file to import to the command message."
+            )
+        if ctx.guild.id in self.importing or ctx.guild.id in self.resets:
+            raise commands.UserFeedbackCheckFailure(
+                "An import or reset is already running in this server."
+            )
+        self.importing.add(ctx.guild.id)
+        try:
+            await self._import(ctx, ctx.message.attachments[0])
+        finally:
+            self.importing.discard(ctx.guild.id)
+
+    async def _import(
+        self, ctx: commands.GuildContext, attachment: discord.Attachment
+    ) -> None:
+        async with ctx.typing():
+            data: bytes = await attachment.read()
+            digest: str = hashlib.sha256(data).hexdigest()
+            parsed: ParsedImport = await asyncio.to_thread(
+                parse, data, attachment.filename
+            )
+        if parsed.error_count:
+            raise commands.UserFeedbackCheckFailure(
+                "Nothing was imported, {} of {} rows are invalid.\n{}".format(
+                    parsed.error_count,
+                    parsed.rows,
+                    box("\n".join(parsed.errors)),
+                )
+            )
+        members: List[int] = sorted(parsed.members)
+        checkpoint: Optional[Dict[str, Any]] = await self.config.guild(
+            ctx.guild
+        ).importing()
+        done: int = (
+            checkpoint["done"]
+            if checkpoint and checkpoint["digest"] == digest
+            else 0
+        )
+        message: discord.Message = await ctx.send(
+            "{} {} rows for {} members...".format(
+                "Resuming the import of" if done else "Importing",
+                parsed.rows,
+                len(members),
+            ),
+            reference=ctx.message.to_reference(fail_if_not_exists=False),
+            allowed_mentions=discord.AllowedMentions(replied_user=False),
+        )
+        conflicts: List[int] = []
+        updated: float = time.monotonic()
+        for offset in range(done, len(members), CHUNK_SIZE):
+            # read and written under the lock, so no punch lands in between
+            async with self.writing[ctx.guild.id]:
+                async with self.member_group(ctx.guild.id)() as data:
+                    for member in members[offset : offset + CHUNK_SIZE]:
+                        merged: Optional[List[ClockType]] = merge(
+                            data.get(str(member), {}).get("clocks", []),
+                            parsed.members[member],
+                        )
+                        if merged is None:
+                            conflicts.append(member)
+                            continue
+                        data.setdefault(str(member), {})["clocks"] = merged
+            done = min(offset + CHUNK_SIZE, len(members))
+            await self.config.guild(ctx.guild).importing.set(
+                {"digest": digest, "done": done}
+            )
+            if time.monotonic() - updated >= PROGRESS_INTERVAL:
+                updated = time.monotonic()
+                with contextlib.suppress(discord.HTTPException):
+                    await message.edit(
+                        content="Imported {}/{} members...".format(
+                            done, len(members)
+                        )
+                    )
+        await self.config.guild(ctx.guild).importing.clear()
+        # everything derived from the clocks is rebuilt once, not per row
+        conf: Dict[
+            int, Dict[str, List[ClockType]]
+        ] = await self.config.all_members(ctx.guild)
+        await self.state.seed(ctx.guild.id, self.open_clocks(conf))
+        await self.state.changed(ctx.guild.id)
+        self.intervals[ctx.guild.id] = IntervalIndex.from_config(conf)
+        self.heatmaps.pop(ctx.guild.id, None)
+        with contextlib.suppress(discord.HTTPException):
+            await message.edit(
+                content="Imported {} rows for {} members.".format(
+                    parsed.rows, len(members) - len(conflicts)
+                )
+            )
+        if conflicts:
+            text: str = (
+                "Skipped {} member{} whose imported entries would come "
+                "after a clock that is still running:\n{}"
+            ).format(
+                len(conflicts),
+                "" if len(conflicts) == 1 else "s",
+                humanize_list(["<@{}>".format(member) for member in conflicts]),
+            )
+            async for page in AsyncIter(pagify(text, delims=[" "])):
+                await ctx.send(
+                    page, allowed_mentions=discord.AllowedMentions.none()
+                )
+
+    @commands.is_owner()
+    @clock.command(name="backend")
+    async def clock_backend(
+        self, ctx: commands.GuildContext, url: Optional[str] = None
+    ) -> None:
+        """
+        Share who is clocked in between several bot instances through Redis.
+
+        Pass a `redis://` URL to use a shared backend, or nothing to go back to keeping clocks in this bot's memory.
+        """
+        if url is None:
+            backend: StateBackend = MemoryBackend()
+        else:
+            # the URL may well contain a password
+            with contextlib.suppress(discord.HTTPException):
+                await ctx.message.delete()
+            try:
+                backend: StateBackend = RedisBackend.from_url(url)
+            except ImportError:
+                raise commands.UserFeedbackCheckFailure(
+                    "The `redis` package needs to be installed for this."
+                )
+            except ValueError as error:
+                raise commands.UserFeedbackCheckFailure(
+                    "Invalid URL - {}".format(error)
+                )
+            backend.listener = self.forget_history
+            try:
+                await backend.start()
+            except Exception as error:
+                await backend.close()
+                raise commands.UserFeedbackCheckFailure(
+                    "Could not connect to the backend - {}".format(error)
+                )
+        await self.seed_state(backend)
+        previous: StateBackend = self.state
+        self.state = backend
+        await previous.close()
+        await self.config.redis_url.set(url)
+        await ctx.send(
+            "Clocks are now kept {}.".format(
+                "in memory" if url is None else "in the shared Redis backend"
+            )
+        )
+
     @commands.guild_only()
     @commands.command(aliases=["clockedin", "cin"])
     @commands.bot_has_permissions(manage_roles=True)
@@ -320,13 +804,11 @@ class TimeTracker(commands.Cog):
         Initiate time tracking for this server, configured roles will be assigned upon successful clock-in.
         """
         async with ctx.typing():
-            cur: Dict[int, Clock] = self.cache.setdefault(ctx.guild.id, {})
-            if cur.get(ctx.author.id, None):
-                raise commands.UserFeedbackCheckFailure(
-                    "{} you are already clocked in, make sure to `{}clockout` first.".format(
-                        ctx.author.mention, ctx.clean_prefix
-                    )
-                )
+            already: str = "{} you are already clocked in, make sure to `{}clockout` first.".format(
+                ctx.author.mention, ctx.clean_prefix
+            )
+            if await self.state.get(ctx.guild.id, ctx.author.id) is not None:
+                raise commands.UserFeedbackCheckFailure(already)
             try:
                 roles: List[discord.Role] = [
                     await commands.RoleConverter().convert(ctx, str(role))
@@ -344,17 +826,23 @@ class TimeTracker(commands.Cog):
                 raise commands.UserFeedbackCheckFailure(
                     "This server has not configured any clocking roles yet."
                 )
+            async with self.writing[ctx.guild.id]:
+                clock: Clock = Clock()
+                # another command (or bot instance) may have won the race since
+                if not await self.state.clock_in(
+                    ctx.guild.id, ctx.author.id, clock.start.timestamp()
+                ):
+                    raise commands.UserFeedbackCheckFailure(already)
+                async with self.config.member(ctx.author).clocks() as clocks:
+                    cast(List[ClockType], clocks).append(await clock.to_json())
+                await self.state.changed(ctx.guild.id, ctx.author.id)
+                if (index := self.intervals.get(ctx.guild.id)) is not None:
+                    index.open(ctx.author.id, clock.start.timestamp())
             with contextlib.suppress(discord.HTTPException):
                 await ctx.author.add_roles(
                     *roles,
                     reason=get_audit_reason(ctx.author, reason="clocked in."),
                 )
-            clock: Clock = Clock()
-            self.cache.setdefault(ctx.guild.id, {}).setdefault(
-                ctx.author.id, clock
-            )
-            async with self.config.member(ctx.author).clocks() as clocks:
-                cast(List[ClockType], clocks).append(await clock.to_json())
         await ctx.send(
             embed=discord.Embed(
                 title="CLOCKED IN",
@@ -384,13 +872,14 @@ class TimeTracker(commands.Cog):
         Clock out from the time tracker for this server, configured roles will be removed upon successful clock-out.
         """
         async with ctx.typing():
-            cur: Dict[int, Clock] = self.cache.setdefault(ctx.guild.id, {})
-            if not (clock := cur.get(ctx.author.id, None)):
-                raise commands.UserFeedbackCheckFailure(
-                    "{} you're not clocked in yet, make sure to `{}clockin` first.".format(
-                        ctx.author.mention, ctx.clean_prefix
-                    )
-                )
+            missing: str = "{} you're not clocked in yet, make sure to `{}clockin` first.".format(
+                ctx.author.mention, ctx.clean_prefix
+            )
+            start: Optional[float] = await self.state.get(
+                ctx.guild.id, ctx.author.id
+            )
+            if start is None:
+                raise commands.UserFeedbackCheckFailure(missing)
             try:
                 roles: List[discord.Role] = [
                     await commands.RoleConverter().convert(ctx, str(role))
@@ -408,18 +897,35 @@ class TimeTracker(commands.Cog):
                 raise commands.UserFeedbackCheckFailure(
                     "This server has not configured any clocking roles yet."
                 )
+            async with self.writing[ctx.guild.id]:
+                # only one clock-out can close this clock, across instances too
+                if not await self.state.clock_out(
+                    ctx.guild.id, ctx.author.id, start
+                ):
+                    raise commands.UserFeedbackCheckFailure(missing)
+                clock: Clock = Clock(
+                    start=start, end=datetime.datetime.now(london())
+                )
+                async with self.config.member(ctx.author).clocks() as clocks:
+                    last: int = len(clocks) - 1
+                    del clocks[last]
+                    clocks.insert(last, await clock.to_json())
+                await self.state.changed(ctx.guild.id, ctx.author.id)
+                if (index := self.intervals.get(ctx.guild.id)) is not None:
+                    index.close(ctx.author.id, clock.end.timestamp())
+                if (heatmap := self.heatmaps.get(ctx.guild.id)) is not None:
+                    heatmap.add(
+                        Shift(
+                            clock.start.timestamp(),
+                            clock.end.timestamp(),
+                            ctx.author.id,
+                        )
+                    )
             with contextlib.suppress(discord.HTTPException):
                 await ctx.author.remove_roles(
                     *roles,
                     reason=get_audit_reason(ctx.author, reason="clocked out."),
                 )
-            clock.end = datetime.datetime.now(LONDON)
-            async with self.config.member(ctx.author).clocks() as clocks:
-                last: int = len(clocks) - 1
-                del clocks[last]
-                clocks.insert(last, await clock.to_json())
-            with contextlib.suppress(KeyError):
-                del self.cache[ctx.guild.id][ctx.author.id]
             difference: datetime.timedelta = clock.end - clock.start
             total: int = int(difference.total_seconds())
             hours, seconds = total // 3600, total % 3600
@@ -497,7 +1003,7 @@ class TimeTracker(commands.Cog):
                         )
                     )
                     difference: datetime.timedelta = (
-                        datetime.datetime.now(LONDON) - clock.start
+                        datetime.datetime.now(london()) - clock.start
                     )
                     duration += difference
                     continue
@@ -0,0 +1,177 @@
+import datetime
+from typing import Dict, Final, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .intervals import Shift
+from .utils import london
+
+
+HOUR: Final[int] = 3600
+DAY: Final[int] = 24 * HOUR
+CELLS: Final[int] = 7 * 24
+
+DAYS: Final[Tuple[str, ...]] = (
+    "Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"
+)  # fmt: skip
+SHADES: Final[str] = " ░▒▓█"
+
+
+def _offsets(hours: np.ndarray) -> np.ndarray:
+    # London is always a whole number of hours off UTC, so one lookup per
+    # distinct hour is enough to move every bucket into local time
+    unique, inverse = np.unique(hours, return_inverse=True)
+    offsets: np.ndarray = np.fromiter(
+        (
+            datetime.datetime.fromtimestamp(int(hour) * HOUR, london())
+            .utcoffset()
+            .total_seconds()  # type: ignore
+            for hour in unique
+        ),
+        dtype=np.int64,
+        count=len(unique),
+    )
+    return offsets[inverse.reshape(-1)]
+
+
+def bin_shifts(
+    starts: np.ndarray, ends: np.ndarray, groups: np.ndarray, count: int
+) -> np.ndarray:
+    """
+    Seconds worked in every weekday × hour cell (London time) for each of
+    ``count`` groups, shaped ``(count, 7, 24)``.
+    """
+    keep: np.ndarray = ends > starts
+    starts, ends, groups = starts[keep], ends[keep], groups[keep]
+    first: np.ndarray = np.floor(starts / HOUR).astype(np.int64)
+    spans: np.ndarray = np.ceil(ends / HOUR).astype(np.int64) - first
+    # one row per hour bucket touched by a shift
+    owner: np.ndarray = np.repeat(np.arange(len(starts)), spans)
+    hours: np.ndarray = first[owner] + (
+        np.arange(owner.size) - np.repeat(np.cumsum(spans) - spans, spans)
+    )
+    seconds: np.ndarray = np.minimum(
+        ends[owner], (hours + 1) * HOUR
+    ) - np.maximum(starts[owner], hours * HOUR)
+    local: np.ndarray = hours * HOUR + _offsets(hours)
+    # 01/01/1970 was a thursday
+    cells: np.ndarray = (
+        groups[owner] * CELLS
+        + ((local // DAY + 3) % 7) * 24
+        + (local // HOUR) % 24
+    )
+    # without any shifts ``bincount`` gives integers, which the float
+    # matrices added later on can't be cast into
+    return (
+        np.bincount(cells, weights=seconds, minlength=count * CELLS)
+        .astype(np.float64, copy=False)
+        .reshape(count, 7, 24)
+    )
+
+
+def bin_shift_list(
+    shifts: Sequence[Shift],
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+) -> np.ndarray:
+    """
+    :func:`bin_shifts` for a single group, clipped to ``since`` - ``until``,
+    on-going shifts count up to ``until`` (or now).
+    """
+    if until is None:
+        until = datetime.datetime.now(london()).timestamp()
+    starts: np.ndarray = np.fromiter(
+        (shift.start for shift in shifts), dtype=np.float64, count=len(shifts)
+    )
+    ends: np.ndarray = np.fromiter(
+        (until if shift.end is None else shift.end for shift in shifts),
+        dtype=np.float64,
+        count=len(shifts),
+    )
+    if since is not None:
+        starts = np.maximum(starts, since)
+    ends = np.minimum(ends, until)
+    groups: np.ndarray = np.zeros(len(shifts), dtype=np.int64)
+    return bin_shifts(starts, ends, groups, 1)[0]
+
+
+class Heatmap:
+    """
+    All-time weekday × hour totals of a guild and of each of its members,
+    kept up to date as shifts close instead of being rebuilt per request.
+    """
+
+    def __init__(self, shifts: Iterable[Shift] = ()) -> None:
+        closed: List[Shift] = [
+            shift for shift in shifts if shift.end is not None
+        ]
+        members: List[int] = sorted({shift.member for shift in closed})
+        position: Dict[int, int] = {
+            member: index for index, member in enumerate(members)
+        }
+        matrices: np.ndarray = bin_shifts(
+            np.fromiter((s.start for s in closed), np.float64, len(closed)),
+            np.fromiter((s.end for s in closed), np.float64, len(closed)),
+            np.fromiter(
+                (position[s.member] for s in closed), np.int64, len(closed)
+            ),
+            len(members),
+        )
+        self.members: Dict[int, np.ndarray] = {
+            member: matrices[index] for index, member in enumerate(members)
+        }
+        self.total: np.ndarray = matrices.sum(axis=0)
+
+    def __repr__(self) -> str:
+        return "<{} members={} hours={:.1f}>".format(
+            type(self).__qualname__, len(self.members), self.total.sum() / HOUR
+        )
+
+    def add(self, shift: Shift) -> None:
+        if shift.end is None:
+            return
+        matrix: np.ndarray = bin_shift_list([shift])
+        self.total += matrix
+        if shift.member in self.members:
+            self.members[shift.member] += matrix
+        else:
+            self.members[shift.member] = matrix
+
+    def remove_member(self, member: int) -> None:
+        matrix: Optional[np.ndarray] = self.members.pop(member, None)
+        if matrix is not None:
+            self.total -= matrix
+
+    def get(self, member: Optional[int] = None) -> np.ndarray:
+        if member is None:
+            return self.total.copy()
+        return self.members.get(member, np.zeros((7, 24))).copy()
+
+
+def render(matrix: np.ndarray) -> str:
+    peak: float = float(matrix.max())
+    levels: np.ndarray = (
+        np.ceil(matrix / peak * (len(SHADES) - 1)).astype(np.int64)
+        if peak > 0
+        else np.zeros(matrix.shape, dtype=np.int64)
+    )
+    header: List[str] = [" "] * 24
+    for hour in range(0, 24, 6):
+        for offset, character in enumerate(str(hour)):
+            header[hour + offset] = character
+    lines: List[str] = ["    {}".format("".join(header).rstrip())]
+    for day, row in zip(DAYS, levels):
+        lines.append(
+            "{} {}".format(day, "".join(SHADES[level] for level in row))
+        )
+    lines.append("")
+    lines.append(
+        "    {}".format(
+            "  ".join(
+                "{} {}%".format(shade, round(100 * level / (len(SHADES) - 1)))
+                for level, shade in enumerate(SHADES)
+                if level
+            )
+        )
+    )
+    return "\n".join(lines)
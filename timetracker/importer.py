@@ -0,0 +1,142 @@
+import io
+import csv
+import json
+import math
+import datetime
+import collections
+from typing import (
+    Any,
+    DefaultDict,
+    Dict,
+    Final,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from .utils import ClockType, london
+
+
+# errors kept for the report, the rest are only counted
+MAXIMUM_ERRORS: Final[int] = 10
+
+JSON_EXTENSIONS: Final[Tuple[str, ...]] = (".jsonl", ".ndjson", ".json")
+
+
+class ParsedImport(NamedTuple):
+    members: Dict[int, List[ClockType]]
+    rows: int
+    errors: List[str]
+    error_count: int
+
+
+def _checked(timestamp: float) -> float:
+    # ``nan`` would slip past every comparison, and neither it nor anything
+    # out of range can be turned back into a date by ``Clock`` later on
+    if not math.isfinite(timestamp):
+        raise ValueError("{!r} is not a valid time".format(timestamp))
+    try:
+        datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
+    except (OverflowError, OSError, ValueError):
+        raise ValueError("{!r} is out of range".format(timestamp))
+    return timestamp
+
+
+def _timestamp(value: Any) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return _checked(float(value))
+    value = str(value).strip()
+    try:
+        timestamp: float = float(value)
+    except ValueError:
+        parsed: datetime.datetime = datetime.datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            parsed = london().localize(parsed)
+        return parsed.timestamp()
+    return _checked(timestamp)
+
+
+def _rows(data: bytes, filename: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    text: io.TextIOWrapper = io.TextIOWrapper(
+        io.BytesIO(data), encoding="utf-8-sig", newline=""
+    )
+    first: str = data.lstrip()[:1].decode("utf-8", "replace")
+    if filename.lower().endswith(JSON_EXTENSIONS) or first == "{":
+        for line, raw in enumerate(text, start=1):
+            if not raw.strip():
+                continue
+            try:
+                row: Any = json.loads(raw)
+            except ValueError as error:
+                yield line, {"error": "invalid JSON ({})".format(error)}
+                continue
+            yield line, row if isinstance(row, dict) else {
+                "error": "expected an object"
+            }
+    else:
+        reader: csv.DictReader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def parse(data: bytes, filename: str) -> ParsedImport:
+    """
+    Validate every row of a CSV / JSONL export, grouped per member and sorted
+    by start. Nothing is written if any row is invalid, so this runs first.
+    """
+    members: DefaultDict[int, List[ClockType]] = collections.defaultdict(list)
+    errors: List[str] = []
+    error_count: int = 0
+    rows: int = 0
+    for line, row in _rows(data, filename):
+        rows += 1
+        try:
+            if "error" in row:
+                raise ValueError(row["error"])
+            member: int = int(row["member"])
+            start: float = _timestamp(row["start"])
+            end: Optional[float] = (
+                _timestamp(row["end"])
+                if row.get("end") not in (None, "")
+                else None
+            )
+            if end is not None and end <= start:
+                raise ValueError("the end has to be after the start")
+        except (KeyError, TypeError, ValueError) as error:
+            error_count += 1
+            if len(errors) < MAXIMUM_ERRORS:
+                errors.append(
+                    "line {}: {}".format(
+                        line,
+                        "missing {}".format(error)
+                        if isinstance(error, KeyError)
+                        else error,
+                    )
+                )
+            continue
+        members[member].append({"start": start, "end": end})
+    for clocks in members.values():
+        clocks.sort(key=lambda clock: clock["start"])
+    return ParsedImport(dict(members), rows, errors, error_count)
+
+
+def merge(
+    existing: List[ClockType], imported: List[ClockType]
+) -> Optional[List[ClockType]]:
+    """
+    Imported clocks merged into a member's history, existing entries win on
+    identical starts so the same file can be imported again safely. ``None``
+    if the result would have a clock that is still open before its last entry.
+    """
+    clocks: Dict[float, ClockType] = {
+        clock["start"]: clock for clock in imported
+    }
+    clocks.update((clock["start"], clock) for clock in existing)
+    merged: List[ClockType] = sorted(
+        clocks.values(), key=lambda clock: clock["start"]
+    )
+    if any(clock["end"] is None for clock in merged[:-1]):
+        return None
+    return merged
@@ -0,0 +1,212 @@
+import bisect
+import heapq
+import itertools
+from typing import (
+    Dict,
+    Final,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    cast,
+)
+
+from .utils import ClockType
+
+
+# closed shifts are buffered until there are this many, then merged in
+REBUILD_THRESHOLD: Final[int] = 64
+
+INFINITY: Final[float] = float("inf")
+
+
+class Shift(NamedTuple):
+    start: float
+    end: Optional[float]
+    member: int
+
+    def overlaps(self, start: float, end: float) -> bool:
+        # half open, someone clocking out at 14:00 isn't on duty at 14:00
+        return self.start <= end and (
+            self.end is None or self.end > start
+        )
+
+
+class IntervalIndex:
+    """
+    Every shift of a guild, answering "who was on duty between A and B"
+    without looking at every stored clock.
+
+    Closed shifts are kept sorted by start with a max-end segment tree on
+    top, which finds the ``k`` overlapping shifts in ``O(log n + k log n)``.
+    Sorted start and end times answer "how many" in ``O(log n)`` and let
+    peaks be found by sweeping only over the punches inside the window.
+    """
+
+    def __init__(self, shifts: Iterable[Shift] = ()) -> None:
+        self._open: Dict[int, float] = {}
+        self._closed: List[Shift] = []
+        self._tree: List[float] = []
+        self._size: int = 0
+        self._pending: List[Shift] = []
+        # start and end times of all closed shifts, pending ones included
+        self._starts: List[float] = []
+        self._ends: List[float] = []
+        closed: List[Shift] = []
+        for shift in shifts:
+            if shift.end is None:
+                self._open[shift.member] = shift.start
+            else:
+                closed.append(shift)
+        self._rebuild(closed)
+
+    @classmethod
+    def from_config(
+        cls, members: Mapping[int, Mapping[str, List[ClockType]]]
+    ) -> "IntervalIndex":
+        return cls(
+            Shift(clock["start"], clock["end"], int(member))
+            for member, data in members.items()
+            for clock in data.get("clocks", [])
+        )
+
+    def __repr__(self) -> str:
+        return "<{} closed={} open={}>".format(
+            type(self).__qualname__, len(self._starts), len(self._open)
+        )
+
+    def __len__(self) -> int:
+        return len(self._starts) + len(self._open)
+
+    def _rebuild(self, closed: List[Shift]) -> None:
+        closed.sort()
+        self._closed = closed
+        self._pending = []
+        self._starts = [shift.start for shift in closed]
+        self._ends = sorted(cast(float, shift.end) for shift in closed)
+        self._size = 1
+        while self._size < len(closed):
+            self._size <<= 1
+        self._tree = [-INFINITY] * (2 * self._size)
+        for position, shift in enumerate(closed):
+            self._tree[self._size + position] = cast(float, shift.end)
+        for node in range(self._size - 1, 0, -1):
+            self._tree[node] = max(
+                self._tree[2 * node], self._tree[2 * node + 1]
+            )
+
+    def open(self, member: int, start: float) -> None:
+        self._open[member] = start
+
+    def close(self, member: int, end: float) -> None:
+        try:
+            start: float = self._open.pop(member)
+        except KeyError:
+            return
+        self.add(Shift(start, end, member))
+
+    def add(self, shift: Shift) -> None:
+        if shift.end is None:
+            self._open[shift.member] = shift.start
+            return
+        bisect.insort(self._starts, shift.start)
+        bisect.insort(self._ends, shift.end)
+        self._pending.append(shift)
+        if len(self._pending) >= REBUILD_THRESHOLD:
+            self._rebuild(self._closed + self._pending)
+
+    def remove_member(self, member: int) -> None:
+        self._open.pop(member, None)
+        self._rebuild(
+            [
+                shift
+                for shift in itertools.chain(self._closed, self._pending)
+                if shift.member != member
+            ]
+        )
+
+    def shifts(self) -> Iterator[Shift]:
+        yield from self._closed
+        yield from self._pending
+        for member, start in self._open.items():
+            yield Shift(start, None, member)
+
+    def _search(self, start: float, end: float) -> Iterator[Shift]:
+        # closed shifts starting by ``end`` which haven't ended by ``start``
+        limit: int = bisect.bisect_right(
+            self._closed, end, key=lambda shift: shift.start
+        )
+        if not limit:
+            return
+        stack: List[Tuple[int, int, int]] = [(1, 0, self._size)]
+        while stack:
+            node, low, high = stack.pop()
+            if low >= limit or self._tree[node] <= start:
+                continue
+            if high - low == 1:
+                yield self._closed[low]
+                continue
+            middle: int = (low + high) // 2
+            stack.append((2 * node + 1, middle, high))
+            stack.append((2 * node, low, middle))
+
+    def overlapping(
+        self, start: float, end: Optional[float] = None
+    ) -> List[Shift]:
+        """
+        Shifts overlapping ``start`` - ``end``, or on-going at ``start``.
+        """
+        end = start if end is None else end
+        shifts: List[Shift] = list(self._search(start, end))
+        shifts.extend(
+            shift for shift in self._pending if shift.overlaps(start, end)
+        )
+        shifts.extend(
+            Shift(began, None, member)
+            for member, began in self._open.items()
+            if began <= end
+        )
+        # open shifts have no end to compare, so ties on start go by member
+        shifts.sort(key=lambda shift: (shift.start, shift.member))
+        return shifts
+
+    def concurrent(self, at: float) -> int:
+        return (
+            bisect.bisect_right(self._starts, at)
+            - bisect.bisect_right(self._ends, at)
+            + sum(1 for began in self._open.values() if began <= at)
+        )
+
+    def peak(self, start: float, end: float) -> Tuple[int, float]:
+        """
+        Highest number of people on duty at once between ``start`` and ``end``,
+        and the first moment it was reached.
+        """
+        current: int = self.concurrent(start)
+        best: Tuple[int, float] = (current, start)
+        opened: List[float] = sorted(
+            began for began in self._open.values() if start < began <= end
+        )
+        starts: List[float] = self._starts[
+            bisect.bisect_right(self._starts, start) : bisect.bisect_right(
+                self._starts, end
+            )
+        ]
+        ends: List[float] = self._ends[
+            bisect.bisect_right(self._ends, start) : bisect.bisect_right(
+                self._ends, end
+            )
+        ]
+        # clock-outs go before clock-ins at the same moment, like ``overlaps``
+        for when, _, change in heapq.merge(
+            ((when, 0, -1) for when in ends),
+            ((when, 1, 1) for when in starts),
+            ((when, 1, 1) for when in opened),
+        ):
+            current += change
+            if current > best[0]:
+                best = (current, when)
+        return best
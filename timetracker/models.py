@@ -3,7 +3,7 @@ import datetime
 import pydantic
 from typing import Annotated, Dict, Generic, Optional, TypeAlias, TypeVar
 
-from .utils import LONDON, ClockType, timezone
+from .utils import ClockType, london, timezone
 
 
 T = TypeVar("T")
@@ -12,7 +12,7 @@ T = TypeVar("T")
 LondonDateTime: TypeAlias = Annotated[
     pydantic.AwareDatetime,
     pydantic.BeforeValidator(
-        lambda d: datetime.datetime.fromtimestamp(d).astimezone(LONDON)
+        lambda d: datetime.datetime.fromtimestamp(d).astimezone(london())
         if isinstance(d, (int, float))
         else d
     ),
@@ -22,8 +22,9 @@ LondonDateTime: TypeAlias = Annotated[
 
 
 class Model(pydantic.BaseModel, Generic[T]):
+    # validators are built on first use instead of on every (re)load of the cog
     model_config: pydantic.ConfigDict = pydantic.ConfigDict(
-        arbitrary_types_allowed=True, strict=True
+        arbitrary_types_allowed=True, strict=True, defer_build=True
     )
 
     async def to_json(self) -> Dict[str, T]:
@@ -32,6 +33,6 @@ class Model(pydantic.BaseModel, Generic[T]):
 
 class Clock(Model[ClockType]):
     start: LondonDateTime = pydantic.Field(
-        default_factory=lambda: datetime.datetime.now(LONDON)
+        default_factory=lambda: datetime.datetime.now(london())
     )
     end: Optional[LondonDateTime] = pydantic.Field(default=None)
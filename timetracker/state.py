@@ -0,0 +1,294 @@
+import abc
+import uuid
+import asyncio
+import logging
+import contextlib
+import collections
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    DefaultDict,
+    Dict,
+    Final,
+    Iterable,
+    Mapping,
+    Optional,
+)
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+    from redis.asyncio.client import PubSub
+
+
+log: logging.Logger = logging.getLogger("red.japandotorg.timetracker")
+
+
+CHANNEL: Final[str] = "timetracker:invalidate"
+KEY: Final[str] = "timetracker:open:{}"
+
+# deletes the clock only if it's still the one the caller read
+COMPARE_AND_DELETE: Final[str] = """
+if redis.call("HGET", KEYS[1], ARGV[1]) == ARGV[2] then
+    return redis.call("HDEL", KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+RECONNECT_DELAY: Final[float] = 5.0
+
+
+class StateBackend(abc.ABC):
+    """
+    Who is currently clocked in, as the clock-in timestamp per guild member.
+
+    ``clock_in`` and ``clock_out`` are compare-and-set, if two commands (or two
+    instances of the bot) race for the same member only one of them succeeds.
+
+    ``listener`` is called with a guild whenever another instance changed its
+    clock history, or with ``None`` if such changes may have been missed.
+    """
+
+    listener: Optional[Callable[[Optional[int]], None]] = None
+
+    async def start(self) -> None:
+        pass
+
+    async def changed(self, guild: int, member: Optional[int] = None) -> None:
+        """Let other instances know the clock history of ``guild`` changed."""
+
+    async def close(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    async def get(self, guild: int, member: int) -> Optional[float]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def clock_in(self, guild: int, member: int, start: float) -> bool:
+        """Open a clock unless the member already has one."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def clock_out(self, guild: int, member: int, start: float) -> bool:
+        """Close the member's clock if it is still the one from ``start``."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def clear(
+        self, guild: int, members: Optional[Iterable[int]] = None
+    ) -> None:
+        raise NotImplementedError
+
+    async def seed(self, guild: int, clocks: Mapping[int, float]) -> None:
+        for member, start in clocks.items():
+            await self.clock_in(guild, member, start)
+
+
+class MemoryBackend(StateBackend):
+    """
+    Default backend, only consistent as long as a single bot process owns it.
+    """
+
+    def __init__(self) -> None:
+        self._clocks: DefaultDict[int, Dict[int, float]] = (
+            collections.defaultdict(dict)
+        )
+
+    def __repr__(self) -> str:
+        return "<{} guilds={}>".format(
+            type(self).__qualname__, len(self._clocks)
+        )
+
+    async def get(self, guild: int, member: int) -> Optional[float]:
+        return self._clocks.get(guild, {}).get(member)
+
+    async def clock_in(self, guild: int, member: int, start: float) -> bool:
+        clocks: Dict[int, float] = self._clocks[guild]
+        if member in clocks:
+            return False
+        clocks[member] = start
+        return True
+
+    async def clock_out(self, guild: int, member: int, start: float) -> bool:
+        clocks: Dict[int, float] = self._clocks.get(guild, {})
+        if clocks.get(member) != start:
+            return False
+        del clocks[member]
+        return True
+
+    async def clear(
+        self, guild: int, members: Optional[Iterable[int]] = None
+    ) -> None:
+        if members is None:
+            self._clocks.pop(guild, None)
+            return
+        clocks: Dict[int, float] = self._clocks.get(guild, {})
+        for member in members:
+            clocks.pop(member, None)
+
+
+class RedisBackend(StateBackend):
+    """
+    Shared state for several bot instances, through anything speaking the Redis
+    protocol (a server, or a stand-in such as ``fakeredis`` for local testing).
+
+    Reads go through a local cache, every write is published on ``CHANNEL`` so
+    the other instances drop their copy of the entries it touched. While the
+    subscription is down the local cache is bypassed entirely.
+    """
+
+    def __init__(self, client: "Redis") -> None:
+        self.client: "Redis" = client
+        self.identifier: str = uuid.uuid4().hex
+        self._local: Dict[int, Dict[int, Optional[float]]] = {}
+        self._listening: bool = False
+        self._listener: Optional[asyncio.Task[None]] = None
+        self._compare_and_delete: Any = client.register_script(
+            COMPARE_AND_DELETE
+        )
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        # only needed by bots which actually configure a shared backend
+        import redis.asyncio
+
+        return cls(redis.asyncio.from_url(url, decode_responses=True))
+
+    def __repr__(self) -> str:
+        return "<{} identifier={} listening={}>".format(
+            type(self).__qualname__, self.identifier, self._listening
+        )
+
+    async def start(self) -> None:
+        await self.client.ping()
+        pubsub: "PubSub" = self.client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(CHANNEL)
+        self._listening = True
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+        await self.client.aclose()
+
+    async def _listen(self, pubsub: "PubSub") -> None:
+        while True:
+            try:
+                async for message in pubsub.listen():
+                    origin, guild, member = str(message["data"]).split(":")
+                    if origin == self.identifier:
+                        continue
+                    self._invalidate(
+                        int(guild), int(member) if member else None
+                    )
+                    if self.listener is not None:
+                        self.listener(int(guild))
+            except asyncio.CancelledError:
+                await pubsub.aclose()
+                raise
+            except Exception as error:
+                log.exception(
+                    "Lost the clock invalidation channel, retrying.",
+                    exc_info=error,
+                )
+            self._listening = False
+            self._local.clear()
+            if self.listener is not None:
+                self.listener(None)
+            await asyncio.sleep(RECONNECT_DELAY)
+            with contextlib.suppress(Exception):
+                await pubsub.aclose()
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(CHANNEL)
+            except Exception:
+                continue
+            self._listening = True
+
+    def _invalidate(self, guild: int, member: Optional[int] = None) -> None:
+        if member is None:
+            self._local.pop(guild, None)
+        else:
+            self._local.get(guild, {}).pop(member, None)
+
+    def _store(self, guild: int, member: int, start: Optional[float]) -> None:
+        if self._listening:
+            self._local.setdefault(guild, {})[member] = start
+
+    async def _publish(self, guild: int, member: Optional[int] = None) -> None:
+        await self.client.publish(
+            CHANNEL,
+            "{}:{}:{}".format(
+                self.identifier, guild, "" if member is None else member
+            ),
+        )
+
+    async def changed(self, guild: int, member: Optional[int] = None) -> None:
+        try:
+            await self._publish(guild, member)
+        except Exception as error:
+            # the history itself is already saved by now
+            log.exception(
+                "Could not announce a clock history change.", exc_info=error
+            )
+
+    async def get(self, guild: int, member: int) -> Optional[float]:
+        cached: Dict[int, Optional[float]] = self._local.get(guild, {})
+        if self._listening and member in cached:
+            return cached[member]
+        value: Optional[str] = await self.client.hget(
+            KEY.format(guild), str(member)
+        )
+        start: Optional[float] = None if value is None else float(value)
+        self._store(guild, member, start)
+        return start
+
+    async def clock_in(self, guild: int, member: int, start: float) -> bool:
+        if not await self.client.hsetnx(
+            KEY.format(guild), str(member), repr(start)
+        ):
+            # whatever we had cached is out of date
+            self._invalidate(guild, member)
+            return False
+        self._store(guild, member, start)
+        await self._publish(guild, member)
+        return True
+
+    async def clock_out(self, guild: int, member: int, start: float) -> bool:
+        if not await self._compare_and_delete(
+            keys=[KEY.format(guild)], args=[str(member), repr(start)]
+        ):
+            self._invalidate(guild, member)
+            return False
+        self._store(guild, member, None)
+        await self._publish(guild, member)
+        return True
+
+    async def clear(
+        self, guild: int, members: Optional[Iterable[int]] = None
+    ) -> None:
+        if members is None:
+            await self.client.delete(KEY.format(guild))
+            self._invalidate(guild)
+            await self._publish(guild)
+            return
+        members = [str(member) for member in members]
+        if not members:
+            return
+        await self.client.hdel(KEY.format(guild), *members)
+        for member in members:
+            self._invalidate(guild, int(member))
+            await self._publish(guild, int(member))
+
+    async def seed(self, guild: int, clocks: Mapping[int, float]) -> None:
+        if not clocks:
+            return
+        async with self.client.pipeline(transaction=False) as pipeline:
+            for member, start in clocks.items():
+                pipeline.hsetnx(KEY.format(guild), str(member), repr(start))
+            await pipeline.execute()
+        self._invalidate(guild)
+        await self._publish(guild)
@@ -1,12 +1,25 @@
-import pytz
 import datetime
-from typing import Final, Optional, TypedDict
+import functools
+from typing import TYPE_CHECKING, Final, Optional, TypedDict
+
+if TYPE_CHECKING:
+    import pytz.tzinfo
 
 
 MAXIMUM_ROLES: Final[int] = 10
 
+# members written or deleted between two progress updates
+CHUNK_SIZE: Final[int] = 100
+PROGRESS_INTERVAL: Final[float] = 2.0
+
+
+@functools.cache
+def london() -> "pytz.tzinfo.BaseTzInfo":
+    # pytz and its zone file are loaded by the first command handling a time,
+    # nothing on the (re)load path of the cog needs them
+    import pytz
 
-LONDON: pytz.tzinfo.BaseTzInfo = pytz.timezone("Europe/London")
+    return pytz.timezone("Europe/London")
 
 
 def timezone(dt: datetime.datetime) -> datetime.datetime:
@@ -14,7 +27,7 @@ def timezone(dt: datetime.datetime) -> datetime.datetime:
         raise ValueError("datetime object must be timezone aware.")
     if getattr(dt.tzinfo, "zone", None) != "Europe/London":
         try:
-            dt: datetime.datetime = dt.astimezone(LONDON)
+            dt: datetime.datetime = dt.astimezone(london())
         except Exception as error:
             raise ValueError(
                 "could not convert datetime to Europe/London timezone: {}".format(